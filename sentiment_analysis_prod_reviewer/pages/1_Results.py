@@ -11,7 +11,8 @@ from datetime import datetime
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
 
-from src.web.app import AmazonReviewScraper, extract_price, predict_sentiment_from_reviews, get_exact_and_alternative_products
+from src.web.app import (AmazonReviewScraper, extract_asin, extract_price, predict_sentiment_from_reviews,
+                         get_exact_and_alternative_products)
 
 # Banner/Header
 st.markdown(
@@ -44,7 +45,8 @@ with st.spinner("Scraping Amazon reviews (up to 5 pages)..."):
         st.error(f"Error scraping reviews: {e}")
         reviews = []
 if reviews:
-    sentiment, score, pos_count, neg_count, detailed_results, model_name = predict_sentiment_from_reviews(reviews)
+    sentiment, score, pos_count, neg_count, detailed_results, model_name = predict_sentiment_from_reviews(
+        reviews, extract_asin(link))
     product_title = reviews[0].get('product_title', 'Amazon Product')
 else:
     st.warning("No reviews found or failed to scrape reviews.")
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Sentiment Scoring Service
+
+Small asyncio HTTP service that wraps SentimentAnalyzer. Requests from many
+Streamlit sessions are gathered into micro-batches, flushed when the batch
+reaches max_batch_size reviews or max_wait_ms has passed, and each batch is
+scored with one vectorized call in a worker thread off the event loop.
+
+Endpoints:
+    POST /analyze  {"reviews": [{"body": ...}, ...], "include_details": true,
+                    "top_k": null, "columnar": false}
+                   top_k and columnar work as in SentimentAnalyzer.analyze_reviews();
+                   columnar 'detailed_results' are sent as AnalysisResult.to_columns()
+    GET  /health   {"status": "ok"}
+    GET  /ready    {"status": "ready"}, or 503 {"status": "warming up"} until
+                   the analyzer's warmup() has finished
+
+Run it from the project root with:
+    python -m src.api.scoring_service --port 8502
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+# Add the project root to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.model_integration import AnalysisResult, SentimentAnalyzer
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8502
+
+
+def _json_default(value):
+    """Encode NumPy scalars and arrays (e.g. ratings read with pandas) as native JSON values"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class MicroBatcher:
+    """Collect concurrent analysis requests and score them in batches"""
+
+    def __init__(self, analyzer, max_batch_size=256, max_wait_ms=10):
+        """
+        Args:
+            analyzer (SentimentAnalyzer): Analyzer used to score each batch
+            max_batch_size (int): Flush once this many reviews are queued
+            max_wait_ms (float): Flush at most this long after the first request arrived
+        """
+        self.analyzer = analyzer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        """Start the background flush loop on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Cancel the flush loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, reviews, include_details=True, top_k=None, columnar=False):
+        """Queue one request and wait for its analyze_reviews() result"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((reviews, (include_details, top_k, columnar), future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+            await self._flush(loop, batch)
+
+    async def _flush(self, loop, batch):
+        """Score a batch in a worker thread and resolve each request's future"""
+        # Requests with the same options are scored together, usually the whole batch
+        groups = {}
+        for item in batch:
+            groups.setdefault(item[1], []).append(item)
+        for (include_details, top_k, columnar), items in groups.items():
+            review_lists = [reviews for reviews, _, _ in items]
+            try:
+                # A request that cannot be analyzed gets its own exception, the others their results
+                results = await loop.run_in_executor(None, functools.partial(
+                    self.analyzer.analyze_review_batches, review_lists, include_details, top_k, columnar,
+                    return_exceptions=True
+                ))
+            except Exception as e:
+                results = [e] * len(items)
+
+            for (_, _, future), result in zip(items, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                    continue
+                if not include_details:
+                    # The fallback analysis always builds the details
+                    result['detailed_results'] = []
+                future.set_result(result)
+
+
+class ScoringService:
+    """Minimal HTTP/1.1 front end for the micro-batcher"""
+
+    def __init__(self, analyzer=None, max_batch_size=256, max_wait_ms=10):
+        self.analyzer = analyzer or SentimentAnalyzer()
+        self.batcher = MicroBatcher(self.analyzer, max_batch_size, max_wait_ms)
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Serve requests until cancelled"""
+        self.batcher.start()
+        # Warm the model off the event loop; /ready reports when it is done
+        asyncio.get_running_loop().run_in_executor(None, self.analyzer.warmup)
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"Sentiment scoring service listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            status, payload = await self._handle_request(reader)
+        except Exception as e:
+            status, payload = 500, {'error': str(e)}
+        body = json.dumps(payload).encode('utf-8')
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error',
+                  503: 'Service Unavailable'}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode('latin-1') + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_request(self, reader):
+        """Parse one request and return (status code, JSON payload)"""
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        if not request_line:
+            return 400, {'error': 'Empty request'}
+        method, path = request_line.split()[:2]
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok'}
+        if method == 'GET' and path == '/ready':
+            if self.analyzer.is_ready:
+                return 200, {'status': 'ready'}
+            return 503, {'status': 'warming up'}
+        if method != 'POST' or path != '/analyze':
+            return 404, {'error': f'No route for {method} {path}'}
+
+        length = int(headers.get('content-length', 0))
+        try:
+            request = json.loads(await reader.readexactly(length)) if length else {}
+        except json.JSONDecodeError as e:
+            return 400, {'error': f'Invalid JSON: {e}'}
+        reviews = request.get('reviews') if isinstance(request, dict) else None
+        if not isinstance(reviews, list):
+            return 400, {'error': "'reviews' must be a list of review objects"}
+        # Reject malformed reviews here so they never reach a shared batch
+        for i, review in enumerate(reviews):
+            if not isinstance(review, dict) or not isinstance(review.get('body'), str):
+                return 400, {'error': f"Review {i} must be an object with a string 'body'"}
+
+        top_k = request.get('top_k')
+        if top_k is not None and (isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1):
+            return 400, {'error': "'top_k' must be a positive integer or null"}
+        columnar = bool(request.get('columnar', False))
+
+        result = await self.batcher.submit(reviews, bool(request.get('include_details', True)), top_k, columnar)
+        if columnar and isinstance(result['detailed_results'], AnalysisResult):
+            result['detailed_results'] = result['detailed_results'].to_columns()
+        return 200, result
+
+
+class ScoringServiceClient(SentimentAnalyzer):
+    """
+    Drop-in replacement for SentimentAnalyzer that scores through the service.
+
+    Results have exactly the analyze_reviews() format. If the service cannot
+    be reached the client falls back to scoring in-process.
+    """
+
+    def __init__(self, base_url=f'http://{DEFAULT_HOST}:{DEFAULT_PORT}', timeout=30, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def service_reachable(self):
+        """True when the service answers /ready, whether or not it has finished warming up"""
+        try:
+            with urllib.request.urlopen(f'{self.base_url}/ready', timeout=self.timeout):
+                return True
+        except urllib.error.HTTPError:
+            # 503 while the service is still warming up
+            return True
+        except (urllib.error.URLError, OSError, ValueError):
+            return False
+
+    def _warm_scoring(self, reviews):
+        # The service warms its own model; only load locally if it cannot be reached
+        if self.service_reachable():
+            return self._fallback_analysis(reviews)
+        return super()._warm_scoring(reviews)
+
+    def analyze_reviews(self, reviews, include_details=True, top_k=None, columnar=False):
+        reviews = list(reviews)
+        try:
+            payload = json.dumps({'reviews': reviews, 'include_details': include_details, 'top_k': top_k,
+                                  'columnar': columnar}, default=_json_default).encode('utf-8')
+            request = urllib.request.Request(
+                f'{self.base_url}/analyze',
+                data=payload,
+                headers={'Content-Type': 'application/json'},
+                method='POST'
+            )
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                result = json.loads(response.read().decode('utf-8'))
+        except (urllib.error.URLError, OSError, ValueError, TypeError) as e:
+            print(f"Scoring service unavailable ({e}), analyzing locally...")
+            return super().analyze_reviews(reviews, include_details, top_k, columnar)
+        if columnar and isinstance(result['detailed_results'], dict):
+            result['detailed_results'] = AnalysisResult.from_columns(reviews, result['detailed_results'])
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-batching sentiment scoring service')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Interface to bind')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('--max-batch-size', type=int, default=256, help='Reviews per batch before flushing')
+    parser.add_argument('--max-wait-ms', type=float, default=10, help='Maximum time a request waits for a batch')
+    args = parser.parse_args()
+
+    service = ScoringService(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nScoring service stopped")
+
+
+if __name__ == "__main__":
+    main()
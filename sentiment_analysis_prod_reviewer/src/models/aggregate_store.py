@@ -0,0 +1,190 @@
+"""
+Product Sentiment Aggregate Store
+
+Persistent per-ASIN sentiment aggregates. Each product keeps its counts,
+confidence sum and a confidence histogram plus the keys of the reviews
+already folded in, so re-analyzing a product only scores reviews that have
+not been seen before and the current summary is read back in O(1). Every
+review counts once, including distinct reviews with the same short text.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from src.models.model_integration import PredictionCache, SentimentTotals
+from src.models.model_registry import DEFAULT_MODEL_NAME
+
+DEFAULT_DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../output/data/sentiment_aggregates.sqlite'))
+
+# Confidence histogram bins over [0, 1]
+HISTOGRAM_BINS = 10
+
+
+# Review fields that together identify a review when it has no ID
+IDENTITY_FIELDS = ('date', 'rating', 'title')
+
+
+def review_identity(review):
+    """
+    Identity of a review: its Amazon review ID when scraped, otherwise its
+    date, rating, title and normalized body text
+    """
+    review_id = review.get('review_id') or review.get('id')
+    if review_id:
+        return f"id:{review_id}"
+    fields = [str(review.get(field) or '') for field in IDENTITY_FIELDS]
+    fields.append(PredictionCache.normalize_text(review.get('body', '')))
+    return json.dumps(fields)
+
+
+def review_keys(reviews):
+    """
+    Stable keys of a list of reviews.
+
+    Reviews without an ID that have the same identity (e.g. two anonymous
+    "Great product" reviews) are told apart by their occurrence number, so
+    each one is counted, while scraping the same list again yields the same
+    keys. Reviews with the same ID are the same review.
+    """
+    occurrences = {}
+    keys = []
+    for review in reviews:
+        identity = review_identity(review)
+        if not identity.startswith('id:'):
+            occurrence = occurrences.get(identity, 0)
+            occurrences[identity] = occurrence + 1
+            identity = f"{identity}#{occurrence}"
+        keys.append(hashlib.sha1(identity.encode('utf-8')).hexdigest())
+    return keys
+
+
+class ProductSentimentStore:
+    """SQLite-backed store of incremental sentiment aggregates per product"""
+
+    # SQLite limits the number of bound parameters per statement
+    _SQL_BATCH_SIZE = 500
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS product_aggregates (
+                asin TEXT PRIMARY KEY,
+                positive_count INTEGER NOT NULL,
+                negative_count INTEGER NOT NULL,
+                confidence_sum REAL NOT NULL,
+                confidence_histogram TEXT NOT NULL,
+                model_name TEXT,
+                updated_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS product_reviews (
+                asin TEXT NOT NULL,
+                review_key TEXT NOT NULL,
+                PRIMARY KEY (asin, review_key)
+            );
+        """)
+        self._db.commit()
+
+    def _seen_keys(self, asin, keys):
+        """Return the subset of keys already folded into the product's aggregate"""
+        seen = set()
+        for start in range(0, len(keys), self._SQL_BATCH_SIZE):
+            batch = keys[start:start + self._SQL_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self._db.execute(
+                f"SELECT review_key FROM product_reviews WHERE asin = ? AND review_key IN ({placeholders})",
+                [asin] + batch
+            ).fetchall()
+            seen.update(row[0] for row in rows)
+        return seen
+
+    def update(self, asin, reviews, analyzer):
+        """
+        Fold newly scraped reviews into a product's aggregate.
+
+        Only reviews that have not been folded in before are scored, see
+        review_keys() for how reviews are identified.
+
+        Args:
+            asin (str): Amazon product ID
+            reviews (list): Review dicts with a 'body' key and optionally
+                'review_id', 'date', 'rating' and 'title'
+            analyzer (SentimentAnalyzer): Analyzer used to score the new reviews
+
+        Returns:
+            dict: The product's updated summary, see summary()
+        """
+        keyed = dict(zip(review_keys(reviews), reviews))
+
+        with self._lock:
+            seen = self._seen_keys(asin, list(keyed))
+            new_keys = [key for key in keyed if key not in seen]
+            if new_keys:
+                results = analyzer.analyze_reviews([keyed[key] for key in new_keys])
+                confidences = np.array([r['confidence'] for r in results['detailed_results']], dtype=np.float64)
+                histogram, _ = np.histogram(confidences, bins=HISTOGRAM_BINS, range=(0.0, 1.0))
+
+                current = self._load(asin)
+                totals = current['totals'].merge(SentimentTotals().add_results(results))
+                merged_histogram = np.asarray(current['histogram']) + histogram
+
+                self._db.execute(
+                    "INSERT OR REPLACE INTO product_aggregates VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (asin, totals.positive_count, totals.negative_count, totals.confidence_sum,
+                     json.dumps(merged_histogram.tolist()), results['model_name'], datetime.now().isoformat())
+                )
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO product_reviews (asin, review_key) VALUES (?, ?)",
+                    [(asin, key) for key in new_keys]
+                )
+                self._db.commit()
+            print(f"Folded {len(new_keys)} new of {len(keyed)} reviews into the aggregate for {asin}")
+        return self.summary(asin)
+
+    def _load(self, asin):
+        """Read the stored aggregate row for a product"""
+        row = self._db.execute(
+            "SELECT positive_count, negative_count, confidence_sum, confidence_histogram, model_name, updated_at "
+            "FROM product_aggregates WHERE asin = ?", (asin,)
+        ).fetchone()
+        if row is None:
+            return {'totals': SentimentTotals(), 'histogram': [0] * HISTOGRAM_BINS,
+                    'model_name': None, 'updated_at': None}
+        positive, negative, confidence_sum, histogram, model_name, updated_at = row
+        return {'totals': SentimentTotals(positive, negative, confidence_sum), 'histogram': json.loads(histogram),
+                'model_name': model_name, 'updated_at': updated_at}
+
+    def summary(self, asin):
+        """
+        Return the current summary for a product without rescoring anything.
+
+        Returns:
+            dict: analyze_reviews()-style summary (with an empty 'detailed_results')
+                  plus 'review_count', 'confidence_histogram' and 'updated_at'
+        """
+        current = self._load(asin)
+        totals = current['totals']
+        result = totals.to_summary(current['model_name'] or DEFAULT_MODEL_NAME)
+        result['review_count'] = totals.total
+        result['confidence_histogram'] = current['histogram']
+        result['updated_at'] = current['updated_at']
+        return result
+
+    def reset(self, asin):
+        """Forget a product's aggregate, e.g. after the model was retrained"""
+        with self._lock:
+            self._db.execute("DELETE FROM product_aggregates WHERE asin = ?", (asin,))
+            self._db.execute("DELETE FROM product_reviews WHERE asin = ?", (asin,))
+            self._db.commit()
+
+    def close(self):
+        """Close the database connection"""
+        self._db.close()
@@ -1,12 +1,20 @@
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
 import os
+import sys
 import csv
 import json
+import shutil
+import time
+import itertools
+import zlib
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import make_pipeline
 from sklearn.neural_network import MLPClassifier
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.naive_bayes import MultinomialNB
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.svm import LinearSVC, SVC
 from sklearn.calibration import CalibratedClassifierCV
@@ -28,6 +36,16 @@ from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.utils import to_categorical
 from sklearn.preprocessing import LabelEncoder
 
+# Add the project root to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.fast_engine import ENGINE_DIRNAME, ENGINE_FILENAME, WEIGHT_DTYPES, export_fast_engine
+from src.models.model_registry import MODEL_METADATA_FILENAME
+from src.models.feature_cache import feature_cache_key, load_features, save_features
+from src.models.review_corpus import iter_review_chunks, load_review_sample
+from src.models.text_preprocessing import deduplicate_texts, normalize_review_text
+from src.models.worker_pool import create_pool, worker_n_jobs
+
 def get_project_root():
     """Get the absolute path to the project root directory"""
     # This assumes the file is in src/models directory
@@ -41,37 +59,61 @@ def ensure_dir_exists(directory):
         os.makedirs(directory)
         print(f"Created directory: {directory}")
 
-def load_and_preprocess_data(sample_size=50000):
-    """Load and preprocess the dataset for sentiment analysis"""
-    print("Loading dataset...")
+# Size of the hashed feature space used by the 'hashing' vectorizer mode
+HASHING_N_FEATURES = 2 ** 14
+
+def get_reviews_csv_path():
+    """Path of the raw Amazon Fine Food reviews dataset"""
     # Use relative path from project root
-    data_path = os.path.join(get_project_root(), 'data', 'raw', 'Reviews.csv')
+    return os.path.join(get_project_root(), 'data', 'raw', 'Reviews.csv')
+
+
+def load_review_split(sample_size=50000, random_state=42, convert_to_parquet=False):
+    """
+    Load the dataset and return the raw train/test review texts and sentiments.
+
+    Only the Text and Score columns are streamed from disk in chunks and the
+    sample is drawn while streaming, so the full file is never held in memory.
+
+    Args:
+        sample_size (int): Number of reviews to sample
+        random_state (int): Seed of the sample and the train/test split
+        convert_to_parquet (bool): Write a Parquet copy of the two columns next to
+            Reviews.csv (requires pyarrow); later runs read it instead of the CSV
+    """
+    print("Loading dataset...")
+    data_path = get_reviews_csv_path()
     
     try:
-        df = pd.read_csv(data_path)
+        df_sample, total_rows, score_counts = load_review_sample(
+            data_path, sample_size, random_state, convert=convert_to_parquet
+        )
     except FileNotFoundError:
         print(f"Error: Could not find the data file at {data_path}")
         print("Please make sure the Reviews.csv file exists in the data/raw directory.")
         raise
     
-    print("Keeping only necessary columns: Text and Score...")
-    df = df[['Text', 'Score']]
+    # Basic data exploration
+    print(f"Dataset rows: {total_rows}, sampled: {len(df_sample)}")
+    print("\nClass distribution:")
+    print(score_counts)
     
     # Convert scores to binary sentiment (1-3: Negative, 4-5: Positive)
     # For binary classification, scores 4-5 are positive and 1-3 are negative
     # As per group decision, score 3 is treated as negative
     print("Converting scores to binary sentiment...")
-    df['Sentiment'] = df['Score'].apply(lambda x: 'Positive' if x >= 4 else 'Negative')
+    df_sample['Sentiment'] = np.where(df_sample['Score'] >= 4, 'Positive', 'Negative')
     print("\nSentiment distribution after conversion:")
-    print(df['Sentiment'].value_counts())
+    print(df_sample['Sentiment'].value_counts())
     
-    # Basic data exploration
-    print(f"Dataset shape: {df.shape}")
-    print("\nClass distribution:")
-    print(df['Score'].value_counts())
-    
-    # Use only a subset of the data for faster processing
-    df_sample = df.sample(n=sample_size, random_state=42)
+    # Strip page boilerplate and drop exact and near-duplicate (SimHash) reviews
+    # so identical texts cannot end up on both sides of the train/test split
+    print("\nNormalizing and deduplicating review texts...")
+    df_sample['Text'] = df_sample['Text'].map(normalize_review_text)
+    df_sample = df_sample[df_sample['Text'] != '']
+    _, inverse = deduplicate_texts(df_sample['Text'].tolist())
+    df_sample = df_sample.iloc[np.sort(np.unique(inverse, return_index=True)[1])]
+    print(f"Reviews after deduplication: {len(df_sample)}")
     
     # Feature engineering - using only the review text for simplicity
     print("\nPreprocessing data...")
@@ -79,16 +121,139 @@ def load_and_preprocess_data(sample_size=50000):
     y = df_sample['Sentiment']  # Target variable is sentiment (Positive/Negative)
     
     # Split the dataset into training and testing sets
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    return train_test_split(X, y, test_size=0.2, random_state=random_state)
+
+
+def build_vectorizer(vectorizer_mode='tfidf', max_features=5000):
+    """
+    Create an unfitted text vectorizer.
+
+    Args:
+        vectorizer_mode (str): 'tfidf' for the vocabulary-based TfidfVectorizer, or
+            'hashing' for a fixed-size feature-hashing front end followed by a stored
+            IDF vector. The hashing mode keeps no vocabulary dict and its memory does
+            not grow with the corpus.
+        max_features (int): Vocabulary size of the 'tfidf' mode
+    """
+    if vectorizer_mode == 'tfidf':
+        return TfidfVectorizer(max_features=max_features)  # Limiting features for simplicity
+    if vectorizer_mode == 'hashing':
+        # Raw term counts from the hasher; the TfidfTransformer applies IDF and L2 norm
+        return make_pipeline(
+            HashingVectorizer(n_features=HASHING_N_FEATURES, alternate_sign=False, norm=None),
+            TfidfTransformer()
+        )
+    raise ValueError(f"Unknown vectorizer mode: {vectorizer_mode!r}")
+
+
+def load_and_preprocess_data(sample_size=50000, vectorizer_mode='tfidf', random_state=42, max_features=5000,
+                             use_cache=True):
+    """
+    Load and preprocess the dataset for sentiment analysis.
+
+    The fitted vectorizer and the sparse train/test matrices are cached on disk
+    (see feature_cache.py), keyed by the data file hash, sample size, seed and
+    vectorizer parameters, so repeat runs skip parsing and vectorization.
+
+    Args:
+        sample_size (int): Number of reviews to sample
+        vectorizer_mode (str): See build_vectorizer()
+        random_state (int): Seed of the sample and the train/test split
+        max_features (int): Vocabulary size of the 'tfidf' mode
+        use_cache (bool): Read and write the feature cache
+    """
+    vectorizer = build_vectorizer(vectorizer_mode, max_features)
+    
+    cache_key = None
+    if use_cache and os.path.exists(get_reviews_csv_path()):
+        cache_key = feature_cache_key(get_reviews_csv_path(), sample_size, random_state, vectorizer)
+        cached = load_features(cache_key)
+        if cached is not None:
+            return cached
+    
+    X_train, X_test, y_train, y_test = load_review_split(sample_size, random_state)
     
-    # Convert text data to numerical features using TF-IDF
-    vectorizer = TfidfVectorizer(max_features=5000)  # Limiting features for simplicity
+    # Convert text data to numerical features
     X_train_tfidf = vectorizer.fit_transform(X_train)
     X_test_tfidf = vectorizer.transform(X_test)
     
+    if cache_key is not None:
+        save_features(cache_key, X_train_tfidf, X_test_tfidf, y_train, y_test, vectorizer)
     return X_train_tfidf, X_test_tfidf, y_train, y_test, vectorizer
 
 
+def compare_vectorizer_modes(sample_size=50000, modes=('tfidf', 'hashing')):
+    """
+    Compare the TF-IDF baseline with the hashing front end.
+
+    Trains the v4 MLP configuration on each feature mode and reports accuracy,
+    F1, the size of the fitted vectorizer, and the transform and end-to-end
+    (transform + predict_proba) latency per 1k reviews.
+    
+    Run it with: python src/models/ai_model.py --compare-vectorizers
+    """
+    import pickle
+    
+    X_train, X_test, y_train, y_test = load_review_split(sample_size)
+    
+    data = []
+    headers = ["Vectorizer", "Accuracy", "F1 Score", "Fit (s)", "Vectorizer (KB)", "Transform ms / 1k reviews",
+               "Predict ms / 1k reviews"]
+    for mode in modes:
+        print(f"\nTraining v4 MLP on '{mode}' features...")
+        vectorizer = build_vectorizer(mode)
+        start = time.perf_counter()
+        X_train_features = vectorizer.fit_transform(X_train)
+        fit_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        X_test_features = vectorizer.transform(X_test)
+        transform_ms = (time.perf_counter() - start) * 1000 / len(X_test) * 1000
+        
+        mlp = MLPClassifier(
+            hidden_layer_sizes=(100,),
+            max_iter=100,
+            alpha=0.0001,
+            solver='adam',
+            random_state=42
+        )
+        mlp.fit(X_train_features, y_train)
+        y_pred = mlp.predict(X_test_features)
+        
+        # Serving path on raw text, best of three runs
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            mlp.predict_proba(vectorizer.transform(X_test))
+            timings.append(time.perf_counter() - start)
+        predict_ms = min(timings) * 1000 / len(X_test) * 1000
+        
+        data.append([
+            mode,
+            f"{accuracy_score(y_test, y_pred):.4f}",
+            f"{f1_score(y_test, y_pred, pos_label='Positive'):.4f}",
+            f"{fit_seconds:.2f}",
+            f"{len(pickle.dumps(vectorizer)) / 1024:.1f}",
+            f"{transform_ms:.2f}",
+            f"{predict_ms:.2f}"
+        ])
+    
+    table = tabulate(data, headers=headers, tablefmt="grid")
+    print("\n" + "=" * 80)
+    print("VECTORIZER MODE COMPARISON")
+    print("=" * 80)
+    print(table)
+    
+    output_dir = os.path.join(get_project_root(), 'output', 'results')
+    ensure_dir_exists(output_dir)
+    output_path = os.path.join(output_dir, 'vectorizer_mode_comparison.txt')
+    with open(output_path, 'w') as f:
+        f.write("VECTORIZER MODE COMPARISON\n")
+        f.write("=" * 80 + "\n")
+        f.write(table)
+    print(f"\nComparison table saved to '{output_path}'")
+
+
 def train_model_v1(X_train, y_train, X_test, y_test):
     """Train and evaluate version 1 of the model (Logistic Regression)"""
     print("\n" + "=" * 50)
@@ -140,7 +305,7 @@ def train_model_v2(X_train, y_train, X_test, y_test):
         min_samples_split=2,     # Minimum samples required to split
         random_state=42,
         verbose=1,
-        n_jobs=-1                # Use all available cores
+        n_jobs=worker_n_jobs()   # All cores, or the worker's share inside a training pool
     )
     
     # Train the model
@@ -277,6 +442,23 @@ def train_model_v5(X_train, y_train, X_test, y_test):
 # Dictionary to store model results for comparison
 model_results = {}
 
+# Serving cost per model, keyed like model_results (see measure_serving_cost)
+serving_results = {}
+
+# Friendly model names for tables, charts and the deployed model's metadata
+MODEL_DISPLAY_NAMES = {
+    "v1_logistic_regression": "Logistic Regression",
+    "v2_random_forest": "Random Forest",
+    "v3_svc": "Support Vector Classifier",
+    "v3_linear_svc": "Linear SVC",
+    "v4_imbalanced": "MLP (Imbalanced)",
+    "v5_balanced": "MLP (Balanced)",
+    "v6_advanced": "Deep Learning",
+    "streaming_sgd": "SGD (Streaming)",
+    "streaming_nb": "Naive Bayes (Streaming)",
+    "streaming_mlp": "MLP (Streaming)"
+}
+
 def evaluate_model(y_true, y_pred, model_version):
     """Evaluate model performance and create visualizations"""
     # Calculate metrics
@@ -317,6 +499,7 @@ def evaluate_model(y_true, y_pred, model_version):
     ensure_dir_exists(output_dir)
     output_path = os.path.join(output_dir, f'sentiment_confusion_matrix_{model_version}.png')
     plt.savefig(output_path)
+    plt.close()
     print(f"\nConfusion matrix saved as '{output_path}'")
     
     return accuracy
@@ -331,6 +514,8 @@ def generate_model_comparison_table():
     # Prepare data for the table
     data = []
     headers = ["Model", "Accuracy", "Precision", "Recall", "F1 Score"]
+    if serving_results:
+        headers += ["p50 ms", "p99 ms", "Reviews/s", "Size (MB)", "Load (s)", "Load Mem (MB)"]
     
     # Define the order of models to display
     model_order = [
@@ -339,31 +524,37 @@ def generate_model_comparison_table():
         "v3_linear_svc",
         "v4_imbalanced", 
         "v5_balanced", 
-        "v6_advanced"
+        "v6_advanced",
+        "streaming_sgd",
+        "streaming_nb",
+        "streaming_mlp"
     ]
     
     # Create friendly names for the models
-    model_names = {
-        "v1_logistic_regression": "Logistic Regression",
-        "v2_random_forest": "Random Forest",
-        "v3_svc": "Support Vector Classifier",
-        "v3_linear_svc": "Linear SVC",
-        "v4_imbalanced": "MLP (Imbalanced)",
-        "v5_balanced": "MLP (Balanced)",
-        "v6_advanced": "Deep Learning"
-    }
+    model_names = MODEL_DISPLAY_NAMES
     
     # Add data for each model in the specified order
     for model_id in model_order:
         if model_id in model_results:
             result = model_results[model_id]
-            data.append([
+            row = [
                 model_names.get(model_id, model_id),
                 f"{result['accuracy']:.4f}",
                 f"{result['precision']:.4f}",
                 f"{result['recall']:.4f}",
                 f"{result['f1']:.4f}"
-            ])
+            ]
+            if serving_results:
+                cost = serving_results.get(model_id)
+                row += [
+                    f"{cost['p50_ms']:.2f}",
+                    f"{cost['p99_ms']:.2f}",
+                    f"{cost['throughput']:.0f}",
+                    f"{cost['size_mb']:.2f}",
+                    f"{cost['load_seconds']:.2f}",
+                    f"{cost['load_memory_mb']:.1f}"
+                ] if cost else ["-"] * 6
+            data.append(row)
     
     # Generate the table
     table = tabulate(data, headers=headers, tablefmt="grid")
@@ -394,15 +585,7 @@ def create_comparison_chart():
         return
     
     # Prepare data for plotting
-    model_names = {
-        "v1_logistic_regression": "Logistic Regression",
-        "v2_random_forest": "Random Forest",
-        "v3_svc": "Support Vector Classifier",
-        "v3_linear_svc": "Linear SVC",
-        "v4_imbalanced": "MLP (Imbalanced)",
-        "v5_balanced": "MLP (Balanced)",
-        "v6_advanced": "Deep Learning"
-    }
+    model_names = MODEL_DISPLAY_NAMES
     
     model_order = [
         "v1_logistic_regression", 
@@ -410,7 +593,10 @@ def create_comparison_chart():
         "v3_linear_svc",
         "v4_imbalanced", 
         "v5_balanced", 
-        "v6_advanced"
+        "v6_advanced",
+        "streaming_sgd",
+        "streaming_nb",
+        "streaming_mlp"
     ]
     
     # Filter to only include models that have results
@@ -467,10 +653,129 @@ def create_comparison_chart():
     plt.savefig(output_path)
     print(f"\nComparison chart saved as '{output_path}'")
     plt.close()
+    
+    create_serving_cost_chart([m for m in available_models if m in serving_results], model_names)
+
+
+def create_serving_cost_chart(model_ids, model_names):
+    """Create bar charts of single-review latency and batch throughput per model"""
+    if not model_ids:
+        return
+    
+    models = [model_names.get(m, m) for m in model_ids]
+    x = np.arange(len(models))
+    width = 0.35
+    
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    ax1.bar(x - width / 2, [serving_results[m]['p50_ms'] for m in model_ids], width, label='p50')
+    ax1.bar(x + width / 2, [serving_results[m]['p99_ms'] for m in model_ids], width, label='p99')
+    ax1.set_ylabel('Milliseconds')
+    ax1.set_title('Single-Review Latency')
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(models, rotation=45, ha='right')
+    ax1.legend()
+    
+    ax2.bar(x, [serving_results[m]['throughput'] for m in model_ids], width, color='#2ca02c')
+    ax2.set_ylabel('Reviews per second')
+    ax2.set_title('Batch Throughput')
+    ax2.set_xticks(x)
+    ax2.set_xticklabels(models, rotation=45, ha='right')
+    
+    fig.tight_layout()
+    
+    output_dir = os.path.join(get_project_root(), 'output', 'visualizations')
+    ensure_dir_exists(output_dir)
+    output_path = os.path.join(output_dir, 'model_serving_cost_chart.png')
+    plt.savefig(output_path)
+    print(f"\nServing cost chart saved as '{output_path}'")
+    plt.close()
+
+
+def benchmark_texts(vectorizer, X, n=1000):
+    """
+    Review texts for timing the full text -> prediction path.
+
+    The cached features do not keep the raw test texts, so pseudo-reviews are
+    rebuilt from the terms of the first n feature rows. Vectorizers without
+    inverse_transform (the hashing mode) fall back to the example reviews.
+    """
+    try:
+        texts = [' '.join(terms) for terms in vectorizer.inverse_transform(X[:n])]
+    except AttributeError:
+        texts = []
+    if not any(texts):
+        texts = [text for text, _ in zip(itertools.cycle(EXAMPLE_TEXTS), range(n))]
+    return texts
 
 
-# Load and preprocess data
-X_train_tfidf, X_test_tfidf, y_train, y_test, vectorizer = load_and_preprocess_data(sample_size=50000)
+def measure_serving_cost(model, vectorizer, texts, model_version, label_encoder=None, n_single=200):
+    """
+    Measure what serving a model costs and store it in serving_results.
+
+    Records the p50/p99 latency of scoring one review at a time (vectorize +
+    predict), the batch throughput over all texts, the serialized artifact
+    size, its load time and the Python-tracked memory allocated while loading it.
+
+    Args:
+        model: Fitted sklearn model, or the Keras v6 model when label_encoder is given
+        vectorizer: Fitted vectorizer
+        texts (list): Benchmark review texts, see benchmark_texts()
+        model_version (str): Key in model_results, e.g. 'v4_imbalanced'
+        label_encoder: The v6 label encoder (marks a Keras model)
+        n_single (int): Number of single-review requests timed
+    """
+    import joblib
+    import tempfile
+    import tracemalloc
+    
+    def predict(X):
+        if label_encoder is not None:
+            return predict_proba_v6(model, X)
+        return model.predict_proba(X)
+    
+    # Pay first-call costs before timing
+    predict(vectorizer.transform(texts[:1]))
+    single_ms = []
+    for text in texts[:n_single]:
+        start = time.perf_counter()
+        predict(vectorizer.transform([text]))
+        single_ms.append((time.perf_counter() - start) * 1000)
+    
+    start = time.perf_counter()
+    predict(vectorizer.transform(texts))
+    throughput = len(texts) / (time.perf_counter() - start)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if label_encoder is not None:
+            path = os.path.join(tmp_dir, 'model.h5')
+            model.save(path)
+            load = lambda: tf.keras.models.load_model(path)
+        else:
+            path = os.path.join(tmp_dir, 'model.pkl')
+            joblib.dump(model, path)
+            load = lambda: joblib.load(path)
+        size_bytes = os.path.getsize(path)
+        
+        tracemalloc.start()
+        start = time.perf_counter()
+        loaded = load()
+        load_seconds = time.perf_counter() - start
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del loaded
+    
+    serving_results[model_version] = {
+        'p50_ms': float(np.percentile(single_ms, 50)),
+        'p99_ms': float(np.percentile(single_ms, 99)),
+        'throughput': throughput,
+        'size_mb': size_bytes / 1024 ** 2,
+        'load_seconds': load_seconds,
+        'load_memory_mb': peak_bytes / 1024 ** 2,
+    }
+    print(f"Serving cost of {model_version}: p50 {serving_results[model_version]['p50_ms']:.2f} ms, "
+          f"p99 {serving_results[model_version]['p99_ms']:.2f} ms, {throughput:.0f} reviews/s")
+    return serving_results[model_version]
+
 
 def predict_sentiment(text, model, vectorizer):
     """Predict sentiment for a given text"""
@@ -481,20 +786,77 @@ def predict_sentiment(text, model, vectorizer):
     return prediction
 
 
+# Example reviews used for the example predictions
+EXAMPLE_TEXTS = [
+    "This product is amazing! I love it and would definitely recommend it to others.",
+    "Terrible experience. The product broke after one use and customer service was unhelpful."
+]
+
+
 def test_example_predictions(model, vectorizer, model_version):
     """Test the model on example texts"""
     print(f"\nExample sentiment predictions for {model_version}:")
-    example_texts = [
-        "This product is amazing! I love it and would definitely recommend it to others.",
-        "Terrible experience. The product broke after one use and customer service was unhelpful."
-    ]
 
-    for text in example_texts:
+    for text in EXAMPLE_TEXTS:
         sentiment = predict_sentiment(text, model, vectorizer)
         print(f"Text: {text[:50]}...")
         print(f"Predicted sentiment: {sentiment}\n")
 
 
+def sparse_batches(X, y=None, batch_size=64, shuffle=False, seed=42):
+    """
+    tf.data pipeline of dense float32 batches sliced from a sparse matrix.
+
+    Only one batch of rows is densified at a time, so the full TF-IDF matrix
+    never exists as a dense array.
+
+    Args:
+        X: Sparse (or dense) feature matrix
+        y (array): Optional labels, yielded with each batch
+        batch_size (int): Rows per batch
+        shuffle (bool): Visit rows in a new random order every epoch
+        seed (int): Seed of the shuffling
+    """
+    X = sp.csr_matrix(X, dtype=np.float32)
+    labels = np.asarray(y, dtype=np.float32) if y is not None else None
+    rng = np.random.default_rng(seed)
+    
+    def generate():
+        order = rng.permutation(X.shape[0]) if shuffle else np.arange(X.shape[0])
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            if labels is None:
+                yield X[rows].toarray()
+            else:
+                yield X[rows].toarray(), labels[rows]
+    
+    features_spec = tf.TensorSpec(shape=(None, X.shape[1]), dtype=tf.float32)
+    if labels is None:
+        signature = features_spec
+    else:
+        signature = (features_spec, tf.TensorSpec(shape=(None,), dtype=tf.float32))
+    return tf.data.Dataset.from_generator(generate, output_signature=signature).prefetch(tf.data.AUTOTUNE)
+
+
+# Inputs up to this many rows skip the tf.data pipeline in predict_proba_v6()
+V6_DIRECT_PREDICT_ROWS = 1024
+
+
+def predict_proba_v6(model, X, batch_size=1024):
+    """
+    Positive-class probabilities of the v6 model for a sparse feature matrix.
+
+    Small inputs are densified and run through a single direct model call,
+    since building a tf.data pipeline costs far more than the forward pass
+    for a handful of reviews. Larger inputs stream through sparse_batches()
+    so only one batch is dense at a time.
+    """
+    if X.shape[0] <= V6_DIRECT_PREDICT_ROWS:
+        X = X.toarray() if sp.issparse(X) else np.asarray(X)
+        return model(X.astype(np.float32, copy=False), training=False).numpy().ravel()
+    return model.predict(sparse_batches(X, batch_size=batch_size), verbose=0).ravel()
+
+
 def train_model_v6(X_train, y_train, X_test, y_test):
     """Train and evaluate version 3 of the model with advanced techniques
     
@@ -528,22 +890,22 @@ def train_model_v6(X_train, y_train, X_test, y_test):
     y_train_encoded = le.fit_transform(y_train_balanced)
     y_test_encoded = le.transform(y_test)
     
-    # Convert to dense numpy arrays if they are sparse matrices
-    if hasattr(X_train_balanced, 'toarray'):
-        X_train_dense = X_train_balanced.toarray()
-    else:
-        X_train_dense = X_train_balanced
-        
-    if hasattr(X_test, 'toarray'):
-        X_test_dense = X_test.toarray()
-    else:
-        X_test_dense = X_test
+    # Keep the features sparse; batches are densified one at a time in float32.
+    # Hold out a random 20% as validation data (the undersampler returns rows
+    # grouped by class, so the last 20% would contain a single class)
+    X_train_balanced = sp.csr_matrix(X_train_balanced, dtype=np.float32)
+    shuffled = np.random.default_rng(42).permutation(X_train_balanced.shape[0])
+    n_validation = int(len(shuffled) * 0.2)
+    fit_rows, validation_rows = shuffled[n_validation:], shuffled[:n_validation]
+    train_data = sparse_batches(X_train_balanced[fit_rows], y_train_encoded[fit_rows], batch_size=64, shuffle=True)
+    validation_data = sparse_batches(X_train_balanced[validation_rows], y_train_encoded[validation_rows],
+                                     batch_size=1024)
     
     # Create an advanced neural network model
     print("\nCreating advanced neural network model...")
     model = Sequential([
         # Input layer with L2 regularization
-        Dense(256, activation='relu', kernel_regularizer=l2(0.001), input_shape=(X_train_dense.shape[1],)),
+        Dense(256, activation='relu', kernel_regularizer=l2(0.001), input_shape=(X_train_balanced.shape[1],)),
         BatchNormalization(),
         Dropout(0.5),  # 50% dropout to prevent overfitting
         
@@ -590,10 +952,9 @@ def train_model_v6(X_train, y_train, X_test, y_test):
     # Train the model
     print("\nTraining advanced model...")
     history = model.fit(
-        X_train_dense, y_train_encoded,
+        train_data,
         epochs=20,
-        batch_size=64,
-        validation_split=0.2,
+        validation_data=validation_data,
         callbacks=[early_stopping, model_checkpoint],
         verbose=1
     )
@@ -626,13 +987,14 @@ def train_model_v6(X_train, y_train, X_test, y_test):
     # Update the filename to reflect the new version number
     output_path = os.path.join(output_dir, 'v6_training_history.png')
     plt.savefig(output_path)
+    plt.close()
     print(f"\nTraining history plot saved as '{output_path}'")
     
     # Evaluate the model
     print("\nEvaluating model...")
-    y_pred_prob = model.predict(X_test_dense)
+    y_pred_prob = predict_proba_v6(model, X_test)
     y_pred = (y_pred_prob > 0.5).astype(int)
-    y_pred = le.inverse_transform(y_pred.flatten())
+    y_pred = le.inverse_transform(y_pred)
     
     # Evaluate the model
     evaluate_model(y_test, y_pred, "v6_advanced")
@@ -645,14 +1007,10 @@ def predict_sentiment_v6(text, model, vectorizer, label_encoder):
     # Vectorize the text
     text_tfidf = vectorizer.transform([text])
     
-    # Convert to dense array if it's a sparse matrix
-    if hasattr(text_tfidf, 'toarray'):
-        text_tfidf = text_tfidf.toarray()
-    
-    # Predict sentiment
-    prediction_prob = model.predict(text_tfidf)
+    # Predict sentiment from the sparse features
+    prediction_prob = predict_proba_v6(model, text_tfidf)
     prediction = (prediction_prob > 0.5).astype(int)
-    sentiment = label_encoder.inverse_transform(prediction.flatten())[0]
+    sentiment = label_encoder.inverse_transform(prediction)[0]
     
     return sentiment
 
@@ -660,19 +1018,21 @@ def predict_sentiment_v6(text, model, vectorizer, label_encoder):
 def test_example_predictions_v6(model, vectorizer, label_encoder, model_version):
     """Test the advanced model on example texts"""
     print(f"\nExample sentiment predictions for {model_version}:")
-    example_texts = [
-        "This product is amazing! I love it and would definitely recommend it to others.",
-        "Terrible experience. The product broke after one use and customer service was unhelpful."
-    ]
 
-    for text in example_texts:
+    for text in EXAMPLE_TEXTS:
         sentiment = predict_sentiment_v6(text, model, vectorizer, label_encoder)
         print(f"Text: {text[:50]}...")
         print(f"Predicted sentiment: {sentiment}\n")
 
 
-def save_model_for_integration(model, vectorizer, model_name="best_model"):
-    """Save the model, vectorizer, and label encoder for integration"""
+def save_model_for_integration(model, vectorizer, model_name="best_model", cascade_model=None, display_name=None):
+    """Save the model, vectorizer, and label encoder for integration
+    
+    cascade_model is an optional fast linear model (e.g. v1) trained on the same
+    features; SentimentAnalyzer(cascade_band=...) uses it as the first stage.
+    display_name is the name the analyzer reports for the model; it is stored in
+    model_metadata.json next to the pickles.
+    """
     import joblib
     from sklearn.preprocessing import LabelEncoder
     
@@ -696,50 +1056,470 @@ def save_model_for_integration(model, vectorizer, model_name="best_model"):
     joblib.dump(label_encoder, os.path.join(models_dir, 'label_encoder.pkl'))
     print(f"Label encoder saved as 'label_encoder.pkl'")
     
+    # Save the name the analyzer and the web app report for this model
+    with open(os.path.join(models_dir, MODEL_METADATA_FILENAME), 'w') as f:
+        json.dump({'model_name': display_name or model_name, 'model_class': type(model).__name__}, f, indent=2)
+    print(f"Model metadata saved as '{MODEL_METADATA_FILENAME}'")
+    
+    # Save the linear first stage for cascade mode, or drop a stale one
+    cascade_path = os.path.join(models_dir, 'cascade_model.pkl')
+    if cascade_model is not None:
+        joblib.dump(cascade_model, cascade_path)
+        print("Cascade model saved as 'cascade_model.pkl'")
+    elif os.path.exists(cascade_path):
+        os.remove(cascade_path)
+        print("Removed stale 'cascade_model.pkl'")
+    
+    # Export the pure NumPy engine for MLP models; the analyzer prefers it when present.
+    # The uncompressed array directory is memory-mapped at load time for fast cold starts,
+    # the compressed .npz is the compact single-file copy.
+    engine_paths = [os.path.join(models_dir, ENGINE_DIRNAME), os.path.join(models_dir, ENGINE_FILENAME)]
+    # Reduced precision engines from export_quantized_model(), served with SentimentAnalyzer(weight_dtype=...)
+    quantized_paths = {weight_dtype: os.path.join(models_dir, f'{ENGINE_DIRNAME}_{weight_dtype}')
+                       for weight_dtype in WEIGHT_DTYPES}
+    try:
+        if not isinstance(model, MLPClassifier):
+            raise ValueError("only MLPClassifier models can be exported")
+        for engine_path in engine_paths:
+            export_fast_engine(model, vectorizer, engine_path)
+        # Re-export the reduced precision engines that were exported for the previous model
+        for weight_dtype, engine_path in quantized_paths.items():
+            if os.path.exists(engine_path):
+                export_fast_engine(model, vectorizer, engine_path, weight_dtype=weight_dtype)
+                print(f"Re-exported '{os.path.basename(engine_path)}'")
+    except (ValueError, AttributeError) as e:
+        print(f"Fast engine not exported: {e}")
+        # Never leave an engine from a previous model next to the new pickles
+        for engine_path in engine_paths + list(quantized_paths.values()):
+            if os.path.isdir(engine_path):
+                shutil.rmtree(engine_path)
+            elif os.path.exists(engine_path):
+                os.remove(engine_path)
+            else:
+                continue
+            print(f"Removed stale '{os.path.basename(engine_path)}'")
+    
     print(f"\nAll files saved successfully in {models_dir}")
     print("The model is now ready for integration with the sentiment analyzer.")
 
 
-def main():
-    """Main function to run all model versions"""
-    # Load and preprocess data
-    X_train_tfidf, X_test_tfidf, y_train, y_test, vectorizer = load_and_preprocess_data(sample_size=50000)
+def evaluate_cascade_bands(linear_model, second_stage_model, X_test, y_test,
+                           bands=((0.5, 0.5), (0.4, 0.6), (0.3, 0.7), (0.2, 0.8), (0.1, 0.9), (0.0, 1.0))):
+    """Report accuracy and second-stage share for several cascade uncertainty bands
     
-    # Train and evaluate version 1 (Logistic Regression)
-    model_v1 = train_model_v1(X_train_tfidf, y_train, X_test_tfidf, y_test)
-    
-    # Test example predictions with version 1
-    test_example_predictions(model_v1, vectorizer, "Version 1 (Logistic Regression)")
-    
-    # Train and evaluate version 2 (Random Forest)
-    model_v2 = train_model_v2(X_train_tfidf, y_train, X_test_tfidf, y_test)
-    
-    # Test example predictions with version 2
-    test_example_predictions(model_v2, vectorizer, "Version 2 (Random Forest)")
+    Reviews whose linear-model positive probability falls inside a band are
+    re-scored by the second stage (the deployed model), so wider bands trade
+    throughput for accuracy.
+    """
+    print("\nEvaluating cascade uncertainty bands...")
+    positive_column = list(linear_model.classes_).index('Positive')
+    positive_probability = linear_model.predict_proba(X_test)[:, positive_column]
+    linear_pred = linear_model.predict(X_test)
+    second_stage_pred = second_stage_model.predict(X_test)
+    y_true = np.asarray(y_test)
     
-    # Train and evaluate version 3 (SVC)
-    model_v3 = train_model_v3(X_train_tfidf, y_train, X_test_tfidf, y_test)
+    data = []
+    for low, high in bands:
+        uncertain = (positive_probability >= low) & (positive_probability <= high)
+        y_pred = np.where(uncertain, second_stage_pred, linear_pred)
+        data.append([
+            f"[{low:.2f}, {high:.2f}]",
+            f"{uncertain.mean():.2%}",
+            f"{accuracy_score(y_true, y_pred):.4f}",
+            f"{f1_score(y_true, y_pred, pos_label='Positive'):.4f}"
+        ])
+    
+    table = tabulate(data, headers=["Band", "Sent to second stage", "Accuracy", "F1 Score"], tablefmt="grid")
+    print(table)
     
-    # Test example predictions with version 3
-    test_example_predictions(model_v3, vectorizer, "Version 3 (SVC)")
+    output_dir = os.path.join(get_project_root(), 'output', 'results')
+    ensure_dir_exists(output_dir)
+    output_path = os.path.join(output_dir, 'cascade_band_results.txt')
+    with open(output_path, 'w') as f:
+        f.write("CASCADE BAND RESULTS\n")
+        f.write("=" * 80 + "\n")
+        f.write(table)
+    print(f"\nCascade band results saved to '{output_path}'")
+
+
+def run_quantization_check(model, vectorizer, X_test, y_test):
+    """Check reduced precision MLP weights against the float64 model and save the table"""
+    from src.models.model_integration import check_quantization_accuracy
+    
+    print("\nChecking quantized MLP weights against the float64 model...")
+    results = check_quantization_accuracy(model, vectorizer, X_test, y_test)
+    
+    headers = ["Weights", "Accuracy", "Agreement", "Max Prob Diff", "Size (KB)", "Compression"]
+    data = [[
+        r['weight_dtype'],
+        f"{r['accuracy']:.4f}",
+        f"{r['agreement']:.4f}",
+        f"{r['max_probability_diff']:.4f}",
+        f"{r['weight_bytes'] / 1024:.1f}",
+        f"{r['compression']:.1f}x"
+    ] for r in results]
+    table = tabulate(data, headers=headers, tablefmt="grid")
+    print(table)
     
-    # Train and evaluate version 4 (imbalanced dataset)
-    model_v4 = train_model_v4(X_train_tfidf, y_train, X_test_tfidf, y_test)
+    output_dir = os.path.join(get_project_root(), 'output', 'results')
+    ensure_dir_exists(output_dir)
+    output_path = os.path.join(output_dir, 'quantization_results.txt')
+    with open(output_path, 'w') as f:
+        f.write("QUANTIZATION ACCURACY CHECK\n")
+        f.write("=" * 80 + "\n")
+        f.write(table)
+    print(f"\nQuantization results saved to '{output_path}'")
+    return results
+
+
+# Incrementally trainable models for the out-of-core streaming mode
+STREAMING_MODELS = ('sgd', 'nb', 'mlp')
+
+
+def build_streaming_model(name):
+    """Create an unfitted model that supports partial_fit"""
+    if name == 'sgd':
+        return SGDClassifier(loss='log_loss', alpha=1e-5, random_state=42)
+    if name == 'nb':
+        return MultinomialNB(alpha=0.1)
+    if name == 'mlp':
+        return MLPClassifier(hidden_layer_sizes=(100,), alpha=0.0001, solver='adam', random_state=42)
+    raise ValueError(f"Unknown streaming model: {name!r}")
+
+
+def build_streaming_vectorizer():
+    """Stateless hashing front end: L2-normalized term counts, no fitted vocabulary or IDF"""
+    return HashingVectorizer(n_features=HASHING_N_FEATURES, alternate_sign=False, norm='l2')
+
+
+def is_holdout_text(text, holdout_fraction):
+    """Deterministic held-out split by text, so duplicates always land on the same side"""
+    return zlib.crc32(text.encode('utf-8')) % 10000 < holdout_fraction * 10000
+
+
+def train_streaming_models(model_names=STREAMING_MODELS, chunksize=50000, holdout_fraction=0.05,
+                           max_holdout_rows=50000, checkpoint_every=5, resume=False):
+    """
+    Train incrementally learnable models over the whole Reviews.csv with bounded memory.
+
+    The corpus is streamed chunk by chunk through a stateless hashing
+    vectorizer and every model is updated with partial_fit. A fixed fraction
+    of the texts is held out (by text hash) as the evaluation stream; up to
+    max_holdout_rows of it are kept as a sparse matrix. Every checkpoint_every
+    chunks the models are evaluated on the holdout seen so far and checkpointed
+    to models/saved/streaming/checkpoint.pkl.
+
+    Args:
+        model_names (tuple): Models to train, see build_streaming_model()
+        chunksize (int): Reviews read and learned at a time
+        holdout_fraction (float): Fraction of texts kept out of training
+        max_holdout_rows (int): Cap on the held-out rows kept in memory
+        checkpoint_every (int): Chunks between checkpoints
+        resume (bool): Continue from the last checkpoint, skipping the chunks it covered
+
+    Returns:
+        dict: {model name: fitted model}
+    """
+    import joblib
     
-    # Test example predictions with version 4
-    test_example_predictions(model_v4, vectorizer, "Version 4 (MLP with imbalanced dataset)")
+    classes = np.array(['Negative', 'Positive'])
+    vectorizer = build_streaming_vectorizer()
+    checkpoint_dir = os.path.join(get_project_root(), 'models', 'saved', 'streaming')
+    ensure_dir_exists(checkpoint_dir)
+    checkpoint_path = os.path.join(checkpoint_dir, 'checkpoint.pkl')
+    
+    state = {'models': {name: build_streaming_model(name) for name in model_names}, 'chunks_done': 0, 'rows_seen': 0}
+    if resume and os.path.exists(checkpoint_path):
+        state = joblib.load(checkpoint_path)
+        print(f"Resuming after {state['chunks_done']} chunks ({state['rows_seen']} training rows)")
+    models = state['models']
+    
+    holdout_X, holdout_y, holdout_rows = [], [], 0
+    
+    def evaluate_holdout():
+        if not holdout_X:
+            return {}
+        X_holdout, y_holdout = sp.vstack(holdout_X), np.concatenate(holdout_y)
+        return {name: accuracy_score(y_holdout, model.predict(X_holdout)) for name, model in models.items()}
+    
+    start = time.perf_counter()
+    for chunk_index, chunk in enumerate(iter_review_chunks(get_reviews_csv_path(), chunksize)):
+        texts = chunk['Text'].map(normalize_review_text)
+        labels = np.where(chunk['Score'].to_numpy() >= 4, 'Positive', 'Negative')
+        holdout = np.fromiter((is_holdout_text(text, holdout_fraction) for text in texts), dtype=bool, count=len(texts))
+        non_empty = (texts != '').to_numpy()
+        
+        # The held-out stream is collected even for chunks a resumed run already trained on
+        if holdout_rows < max_holdout_rows and (holdout & non_empty).any():
+            rows = np.flatnonzero(holdout & non_empty)[:max_holdout_rows - holdout_rows]
+            holdout_X.append(vectorizer.transform(texts.iloc[rows]))
+            holdout_y.append(labels[rows])
+            holdout_rows += len(rows)
+        if chunk_index < state['chunks_done']:
+            continue
+        
+        train_rows = np.flatnonzero(~holdout & non_empty)
+        X_chunk = vectorizer.transform(texts.iloc[train_rows])
+        for model in models.values():
+            model.partial_fit(X_chunk, labels[train_rows], classes=classes)
+        state['chunks_done'] = chunk_index + 1
+        state['rows_seen'] += len(train_rows)
+        
+        if state['chunks_done'] % checkpoint_every == 0:
+            joblib.dump(state, checkpoint_path)
+            scores = ', '.join(f"{name}={accuracy:.4f}" for name, accuracy in evaluate_holdout().items())
+            print(f"Chunk {state['chunks_done']}: {state['rows_seen']} rows trained in "
+                  f"{time.perf_counter() - start:.0f}s, holdout accuracy {scores}")
+    
+    joblib.dump(state, checkpoint_path)
+    print(f"\nStreaming training finished: {state['rows_seen']} rows, {holdout_rows} held out")
+    
+    # Final evaluation on the held-out stream
+    for name, model in models.items():
+        if holdout_X:
+            evaluate_model(np.concatenate(holdout_y), model.predict(sp.vstack(holdout_X)), f"streaming_{name}")
+        joblib.dump(model, os.path.join(checkpoint_dir, f'{name}.pkl'))
+    joblib.dump(vectorizer, os.path.join(checkpoint_dir, 'vectorizer.pkl'))
+    return models
+
+
+def save_model_artifacts(version, model, metrics):
+    """
+    Write one trained model and its metrics next to the other per-model outputs.
+
+    The model goes to models/saved/model_<version>.pkl (the Keras v6 model is
+    already checkpointed as best_model_v6.h5) and the metrics to
+    output/results/<version>_metrics.json.
+    """
+    import joblib
     
-    # Train and evaluate version 5 (balanced dataset)
-    model_v5 = train_model_v5(X_train_tfidf, y_train, X_test_tfidf, y_test)
+    if version != 'v6':
+        models_dir = os.path.join(get_project_root(), 'models', 'saved')
+        ensure_dir_exists(models_dir)
+        joblib.dump(model, os.path.join(models_dir, f'model_{version}.pkl'))
     
-    # Test example predictions with version 5
-    test_example_predictions(model_v5, vectorizer, "Version 5 (MLP with balanced dataset)")
+    results_dir = os.path.join(get_project_root(), 'output', 'results')
+    ensure_dir_exists(results_dir)
+    with open(os.path.join(results_dir, f'{version}_metrics.json'), 'w') as f:
+        json.dump({name: float(value) for name, value in metrics.items()}, f, indent=2)
+
+
+# Training data used inside worker processes (inherited through fork or loaded by _init_training_worker)
+_training_data = None
+
+
+def _init_training_worker(settings):
+    """Pool initializer: make sure the worker has the shared train/test matrices"""
+    global _training_data
+    if _training_data is None:
+        # Spawned workers read the features back from the on-disk feature cache
+        _training_data = load_and_preprocess_data(**settings)[:4]
+
+
+def _run_training_job(version):
+    """Train one model in a worker process and return (model, metrics)"""
+    X_train, X_test, y_train, y_test = _training_data
+    trainer, result_id, _ = TrainingPipeline.TRAINERS[version]
+    model = trainer(X_train, y_train, X_test, y_test)
+    metrics = model_results[result_id]
+    save_model_artifacts(version, model, metrics)
+    return model, metrics
+
+
+class TrainingPipeline:
+    """
+    Lazily evaluated training run shared by the v1-v6 trainers.
+
+    Nothing is loaded when the pipeline is created. The data split and
+    features are computed on first access (through the feature cache) and
+    each model is trained the first time it is requested, so every trainer
+    and evaluation step reuses the same matrices and fitted models.
+
+    run_parallel() executes the job graph features -> {v1, ..., v6} on a
+    process pool: the features are computed once in the parent and the
+    independent models train concurrently.
+    """
+
+    # version -> (trainer, key in model_results, description used in example predictions)
+    TRAINERS = {
+        'v1': (train_model_v1, "v1_logistic_regression", "Version 1 (Logistic Regression)"),
+        'v2': (train_model_v2, "v2_random_forest", "Version 2 (Random Forest)"),
+        'v3': (train_model_v3, "v3_linear_svc", "Version 3 (SVC)"),
+        'v4': (train_model_v4, "v4_imbalanced", "Version 4 (MLP with imbalanced dataset)"),
+        'v5': (train_model_v5, "v5_balanced", "Version 5 (MLP with balanced dataset)"),
+        'v6': (train_model_v6, "v6_advanced", "Version 6 (Advanced)"),
+    }
+
+    def __init__(self, sample_size=50000, vectorizer_mode='tfidf', random_state=42, max_features=5000,
+                 use_cache=True):
+        """
+        Args:
+            sample_size, vectorizer_mode, random_state, max_features, use_cache:
+                Passed to load_and_preprocess_data()
+        """
+        self.sample_size = sample_size
+        self.vectorizer_mode = vectorizer_mode
+        self.random_state = random_state
+        self.max_features = max_features
+        self.use_cache = use_cache
+        self._data = None
+        self._models = {}
+        self.label_encoder = None
+
+    @property
+    def settings(self):
+        """Keyword arguments for load_and_preprocess_data()"""
+        return {
+            'sample_size': self.sample_size,
+            'vectorizer_mode': self.vectorizer_mode,
+            'random_state': self.random_state,
+            'max_features': self.max_features,
+            'use_cache': self.use_cache,
+        }
+
+    @property
+    def data(self):
+        """(X_train, X_test, y_train, y_test, vectorizer), loaded on first access"""
+        if self._data is None:
+            self._data = load_and_preprocess_data(**self.settings)
+        return self._data
+
+    @property
+    def X_train(self):
+        return self.data[0]
+
+    @property
+    def X_test(self):
+        return self.data[1]
+
+    @property
+    def y_train(self):
+        return self.data[2]
+
+    @property
+    def y_test(self):
+        return self.data[3]
+
+    @property
+    def vectorizer(self):
+        return self.data[4]
+
+    def model(self, version):
+        """Return the fitted model for a version ('v1'-'v6'), training it on first request"""
+        if version not in self._models:
+            trainer, result_id, _ = self.TRAINERS[version]
+            model = trainer(self.X_train, self.y_train, self.X_test, self.y_test)
+            if version == 'v6':
+                # The Keras model predicts encoded labels
+                model, self.label_encoder = model
+            save_model_artifacts(version, model, model_results[result_id])
+            self._add_model(version, model)
+        return self._models[version]
+
+    def _add_model(self, version, model):
+        """Keep a trained model and show its example predictions"""
+        description = self.TRAINERS[version][2]
+        if version == 'v6':
+            test_example_predictions_v6(model, self.vectorizer, self.label_encoder, description)
+        else:
+            test_example_predictions(model, self.vectorizer, description)
+        self._models[version] = model
+
+    def run(self, versions=tuple(TRAINERS)):
+        """Train the given versions in order and return {version: model}"""
+        return {version: self.model(version) for version in versions}
+
+    def run_parallel(self, versions=tuple(TRAINERS), n_workers=None):
+        """
+        Train the given versions concurrently and return {version: model}.
+
+        The scikit-learn models train in a process pool. The Keras v6 model
+        trains in this process meanwhile, because TensorFlow models do not
+        cross process boundaries. Each job writes its own confusion matrix,
+        metrics and model file; the metrics are merged into model_results
+        here so the comparison table can be built afterwards.
+
+        Args:
+            versions (tuple): Versions to train
+            n_workers (int): Worker processes (defaults to one per model, capped at the core count)
+        """
+        pending = [version for version in versions if version not in self._models]
+        pool_versions = [version for version in pending if version != 'v6']
+        
+        # Shared features are computed once, before any worker starts
+        X_train, X_test, y_train, y_test, _ = self.data
+
+        def share_features():
+            # Forked workers inherit the matrices copy-on-write instead of receiving them pickled
+            global _training_data
+            _training_data = (X_train, X_test, y_train, y_test)
+
+        if pool_versions:
+            n_workers = n_workers or min(len(pool_versions), os.cpu_count() or 1)
+            start = time.perf_counter()
+            with create_pool(n_workers, initializer=_init_training_worker, initargs=(self.settings,),
+                             prepare_parent=share_features) as pool:
+                jobs = {version: pool.apply_async(_run_training_job, (version,)) for version in pool_versions}
+                if 'v6' in pending:
+                    self.model('v6')
+                for version, job in jobs.items():
+                    model, metrics = job.get()
+                    model_results[self.TRAINERS[version][1]] = metrics
+                    self._add_model(version, model)
+            print(f"\nTrained {len(pending)} models in {time.perf_counter() - start:.1f}s")
+        elif 'v6' in pending:
+            self.model('v6')
+        return {version: self._models[version] for version in versions}
+
+    def measure_serving_costs(self, versions=tuple(TRAINERS)):
+        """Measure latency, throughput, size, load time and memory of trained models, one at a time"""
+        texts = benchmark_texts(self.vectorizer, self.X_test)
+        for version in versions:
+            if version in self._models:
+                label_encoder = self.label_encoder if version == 'v6' else None
+                measure_serving_cost(self._models[version], self.vectorizer, texts,
+                                     self.TRAINERS[version][1], label_encoder)
+
+    def select_serving_model(self, versions=('v1', 'v2', 'v3', 'v4', 'v5'), max_f1_drop=0.005):
+        """
+        Pick the version to deploy, weighing accuracy against serving cost.
+
+        Among the models whose F1 is within max_f1_drop of the best F1, the one
+        with the lowest p99 single-review latency wins (smaller artifact breaks
+        ties). Without serving measurements this is simply the best F1. v6 is
+        not a candidate because the analyzer serves scikit-learn models.
+        """
+        candidates = [version for version in versions if self.TRAINERS[version][1] in model_results]
+        best_f1 = max(model_results[self.TRAINERS[version][1]]['f1'] for version in candidates)
+        close = [version for version in candidates
+                 if model_results[self.TRAINERS[version][1]]['f1'] >= best_f1 - max_f1_drop]
+        
+        def serving_cost(version):
+            cost = serving_results.get(self.TRAINERS[version][1])
+            if cost is None:
+                return (float('inf'), float('inf'), -model_results[self.TRAINERS[version][1]]['f1'])
+            return (cost['p99_ms'], cost['size_mb'], -model_results[self.TRAINERS[version][1]]['f1'])
+        
+        selected = min(close, key=serving_cost)
+        print(f"\nSelected {self.TRAINERS[selected][2]} for serving "
+              f"(F1 within {max_f1_drop} of the best: {', '.join(close)})")
+        return selected
+
+
+def main(vectorizer_mode='tfidf'):
+    """Main function to run all model versions
     
-    # Train and evaluate version 6 (advanced model)
-    model_v6, label_encoder = train_model_v6(X_train_tfidf, y_train, X_test_tfidf, y_test)
+    Args:
+        vectorizer_mode (str): Feature front end of all models, see build_vectorizer()
+    """
+    # Data, features and models are computed once, on demand
+    pipeline = TrainingPipeline(sample_size=50000, vectorizer_mode=vectorizer_mode)
+    pipeline.run_parallel()
+    model_v1 = pipeline.model('v1')
+    vectorizer, X_test_tfidf, y_test = pipeline.vectorizer, pipeline.X_test, pipeline.y_test
     
-    # Test example predictions with version 6
-    test_example_predictions_v6(model_v6, vectorizer, label_encoder, "Version 6 (Advanced)")
+    # Serving cost is measured after all training finished so the timings are not contended
+    pipeline.measure_serving_costs()
     
     # Get the model path for the final message
     models_dir = os.path.join(get_project_root(), 'models', 'saved')
@@ -748,9 +1528,22 @@ def main():
     # Generate comparison table and visualization
     generate_model_comparison_table()
     
-    # Save the best model (MLP Imbalanced - model_v4) for integration
-    # Based on the comparison results, this model has the best F1 score
-    save_model_for_integration(model_v4, vectorizer, "MLP Imbalanced (v4)")
+    # Save the model with the best F1, preferring a cheaper one to serve when it is about as accurate
+    # The Logistic Regression (v1) is kept as the cheap first stage for cascade mode
+    selected = pipeline.select_serving_model()
+    selected_model = pipeline.model(selected)
+    save_model_for_integration(selected_model, vectorizer, pipeline.TRAINERS[selected][2],
+                               cascade_model=model_v1 if selected != 'v1' else None,
+                               display_name=MODEL_DISPLAY_NAMES[pipeline.TRAINERS[selected][1]])
+    if selected != 'v1':
+        # The deployed model is the cascade's second stage
+        evaluate_cascade_bands(model_v1, selected_model, X_test_tfidf, y_test)
+    
+    # Make sure reduced precision weights still match the float64 model on the held-out split
+    if isinstance(selected_model, MLPClassifier) and isinstance(vectorizer, TfidfVectorizer):
+        run_quantization_check(selected_model, vectorizer, X_test_tfidf, y_test)
+    else:
+        print("Skipping the quantization check, the fast engine needs an MLP on TF-IDF features")
     
     print("\nModel comparison complete. Check the confusion matrices and classification reports for detailed results.")
     print(f"\nAdvanced model (v6) has been saved as '{model_path}'.")
@@ -758,4 +1551,13 @@ def main():
 
 # Run the main function
 if __name__ == "__main__":
-    main()
+    if '--streaming' in sys.argv:
+        # Out-of-core training over the full corpus instead of the in-memory sample
+        train_streaming_models()
+        generate_model_comparison_table()
+    elif '--compare-vectorizers' in sys.argv:
+        # Accuracy and latency of the hashing front end against the TF-IDF baseline
+        compare_vectorizer_modes()
+    else:
+        # --hashing trains and deploys every model on the hashing front end instead of TF-IDF
+        main(vectorizer_mode='hashing' if '--hashing' in sys.argv else 'tfidf')
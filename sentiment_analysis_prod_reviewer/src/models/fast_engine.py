@@ -0,0 +1,298 @@
+"""
+Fast Sentiment Engine
+
+Pure NumPy/SciPy inference for the TF-IDF + MLPClassifier pipeline. The
+fitted vectorizer and MLP are exported once, either to a compact .npz file
+or to a directory of uncompressed .npy arrays that can be memory-mapped for
+fast cold starts. The engine then runs tokenize -> sparse TF-IDF -> matmul
+-> activation without importing scikit-learn or going through its per-call
+input validation.
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.special import expit
+
+# Default file and directory names used next to the pickled model in src/models
+ENGINE_FILENAME = 'sentiment_engine.npz'
+ENGINE_DIRNAME = 'sentiment_engine'
+
+# Storage types supported for the MLP weights. float16 and int8 weights are
+# upcast layer by layer and the forward pass runs in float32.
+WEIGHT_DTYPES = ('float64', 'float32', 'float16', 'int8')
+
+ACTIVATIONS = {
+    'identity': lambda x: x,
+    'logistic': expit,
+    'tanh': np.tanh,
+    'relu': lambda x: np.maximum(x, 0, out=x),
+}
+
+
+def _softmax(x):
+    x = x - x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+
+def quantize_weights(coef, weight_dtype):
+    """
+    Convert one weight matrix to the storage dtype.
+
+    Returns:
+        tuple: (converted array, per-layer scale for int8 or None)
+    """
+    if weight_dtype not in WEIGHT_DTYPES:
+        raise ValueError(f"Unsupported weight dtype: {weight_dtype!r}")
+    coef = np.asarray(coef, dtype=np.float64)
+    if weight_dtype != 'int8':
+        return coef.astype(weight_dtype), None
+    # Symmetric per-layer quantization onto [-127, 127]
+    max_abs = float(np.abs(coef).max())
+    scale = max_abs / 127 if max_abs > 0 else 1.0
+    return np.clip(np.round(coef / scale), -127, 127).astype(np.int8), scale
+
+
+def _engine_arrays(model, vectorizer, weight_dtype='float64'):
+    """
+    Collect the arrays and scalar settings that define the fitted pipeline.
+
+    Raises:
+        ValueError: If the vectorizer uses options the engine does not reproduce
+    """
+    unsupported = []
+    if vectorizer.analyzer != 'word':
+        unsupported.append(f"analyzer={vectorizer.analyzer!r}")
+    if tuple(vectorizer.ngram_range) != (1, 1):
+        unsupported.append(f"ngram_range={vectorizer.ngram_range!r}")
+    for option in ('preprocessor', 'tokenizer', 'stop_words', 'strip_accents'):
+        if getattr(vectorizer, option) is not None:
+            unsupported.append(f"{option}={getattr(vectorizer, option)!r}")
+    if vectorizer.binary or vectorizer.sublinear_tf:
+        unsupported.append("binary/sublinear_tf")
+    if vectorizer.norm not in ('l2', None):
+        unsupported.append(f"norm={vectorizer.norm!r}")
+    if unsupported:
+        raise ValueError(f"Vectorizer options not supported by the fast engine: {', '.join(unsupported)}")
+
+    terms = [None] * len(vectorizer.vocabulary_)
+    for term, index in vectorizer.vocabulary_.items():
+        terms[index] = term
+
+    if vectorizer.use_idf:
+        idf = np.asarray(vectorizer.idf_, dtype=np.float64)
+    else:
+        idf = np.ones(len(terms), dtype=np.float64)
+
+    arrays = {
+        'vocabulary': np.array(terms, dtype=str),
+        'idf': idf,
+        'classes': np.asarray(model.classes_).astype(str),
+    }
+    intercept_dtype = np.float64 if weight_dtype == 'float64' else np.float32
+    for i, (coef, intercept) in enumerate(zip(model.coefs_, model.intercepts_)):
+        coef, scale = quantize_weights(coef, weight_dtype)
+        arrays[f'coef_{i}'] = np.ascontiguousarray(coef)
+        arrays[f'intercept_{i}'] = np.ascontiguousarray(intercept, dtype=intercept_dtype)
+        if scale is not None:
+            arrays[f'coef_scale_{i}'] = np.array(scale, dtype=np.float64)
+
+    metadata = {
+        'activation': model.activation,
+        'out_activation': model.out_activation_,
+        'token_pattern': vectorizer.token_pattern,
+        'lowercase': bool(vectorizer.lowercase),
+        'norm': vectorizer.norm or '',
+        'n_layers': len(model.coefs_),
+        'weight_dtype': weight_dtype,
+    }
+    return arrays, metadata
+
+
+def export_fast_engine(model, vectorizer, path, weight_dtype='float64'):
+    """
+    Write the vocabulary, IDF vector and MLP weights for the fast engine.
+
+    A path ending in .npz produces a single compressed file. Any other path
+    is treated as a directory of uncompressed .npy files plus metadata.json,
+    which FastSentimentEngine.load() can memory-map.
+
+    Args:
+        model: Fitted sklearn MLPClassifier
+        vectorizer: Fitted sklearn TfidfVectorizer
+        path (str): Destination .npz file or directory
+        weight_dtype (str): Storage type of the MLP weights, one of WEIGHT_DTYPES.
+            int8 weights are stored with one float scale per layer.
+
+    Raises:
+        ValueError: If the vectorizer uses options the engine does not reproduce
+    """
+    arrays, metadata = _engine_arrays(model, vectorizer, weight_dtype)
+
+    if path.endswith('.npz'):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        scalars = {name: np.array(value) for name, value in metadata.items()}
+        np.savez_compressed(path, **arrays, **scalars)
+    else:
+        os.makedirs(path, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f'{name}.npy'), array)
+        with open(os.path.join(path, 'metadata.json'), 'w') as f:
+            json.dump(metadata, f, indent=2)
+    print(f"Fast inference engine saved as '{path}'")
+
+
+class FastSentimentEngine:
+    """Lightweight TF-IDF + MLP forward pass using only NumPy and SciPy"""
+
+    def __init__(self, vocabulary, idf, coefs, intercepts, classes,
+                 activation='relu', out_activation='logistic',
+                 token_pattern=r"(?u)\b\w\w+\b", lowercase=True, norm='l2', coef_scales=None):
+        self.vocabulary = {str(term): i for i, term in enumerate(vocabulary)}
+        self.idf = idf
+        self.coefs = list(coefs)
+        self.intercepts = list(intercepts)
+        self.classes_ = np.asarray(classes)
+        self.activation = str(activation)
+        self.out_activation = str(out_activation)
+        self.lowercase = bool(lowercase)
+        self.norm = str(norm) if norm else None
+        self._token_re = re.compile(str(token_pattern))
+        self.coef_scales = list(coef_scales) if coef_scales is not None else [None] * len(self.coefs)
+        # Full precision models run in float64, reduced precision ones in float32
+        if all(coef.dtype == np.float64 for coef in self.coefs):
+            self.compute_dtype = np.float64
+        else:
+            self.compute_dtype = np.float32
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """
+        Load an engine written by export_fast_engine().
+
+        Args:
+            path (str): Exported .npz file or array directory
+            mmap_mode (str): Passed to np.load for array directories, e.g. 'r'
+                to memory-map the weights so processes on one host share pages
+        """
+        if os.path.isdir(path):
+            with open(os.path.join(path, 'metadata.json')) as f:
+                metadata = json.load(f)
+
+            def array(name):
+                return np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+
+            metadata['coef_scales'] = []
+            for i in range(int(metadata['n_layers'])):
+                scale_path = os.path.join(path, f'coef_scale_{i}.npy')
+                metadata['coef_scales'].append(float(np.load(scale_path)) if os.path.exists(scale_path) else None)
+            return cls._from_arrays(array, metadata)
+
+        with np.load(path, allow_pickle=False) as data:
+            metadata = {name: data[name].item() for name in
+                        ('activation', 'out_activation', 'token_pattern', 'lowercase', 'norm', 'n_layers')
+                        if name in data.files}
+            metadata['coef_scales'] = [data[f'coef_scale_{i}'].item() if f'coef_scale_{i}' in data.files else None
+                                       for i in range(int(metadata['n_layers']))]
+            return cls._from_arrays(lambda name: data[name], metadata)
+
+    @classmethod
+    def from_model(cls, model, vectorizer, weight_dtype='float64'):
+        """Build an engine in memory from a fitted MLPClassifier and TfidfVectorizer"""
+        arrays, metadata = _engine_arrays(model, vectorizer, weight_dtype)
+        metadata['coef_scales'] = [float(arrays[f'coef_scale_{i}']) if f'coef_scale_{i}' in arrays else None
+                                   for i in range(metadata['n_layers'])]
+        return cls._from_arrays(arrays.__getitem__, metadata)
+
+    @classmethod
+    def _from_arrays(cls, array, metadata):
+        """Build an engine from an array getter and the scalar settings"""
+        n_layers = int(metadata['n_layers'])
+        return cls(
+            vocabulary=array('vocabulary'),
+            idf=array('idf'),
+            coefs=[array(f'coef_{i}') for i in range(n_layers)],
+            intercepts=[array(f'intercept_{i}') for i in range(n_layers)],
+            classes=array('classes'),
+            activation=metadata['activation'],
+            out_activation=metadata['out_activation'],
+            token_pattern=metadata['token_pattern'],
+            lowercase=metadata['lowercase'],
+            norm=metadata['norm'],
+            coef_scales=metadata.get('coef_scales'),
+        )
+
+    def transform(self, texts):
+        """Convert texts to the same L2-normalized TF-IDF CSR matrix as the fitted vectorizer"""
+        vocabulary = self.vocabulary
+        indices = []
+        indptr = [0]
+        for text in texts:
+            text = str(text)
+            if self.lowercase:
+                text = text.lower()
+            for token in self._token_re.findall(text):
+                index = vocabulary.get(token)
+                if index is not None:
+                    indices.append(index)
+            indptr.append(len(indices))
+
+        indices = np.asarray(indices, dtype=np.int32)
+        data = np.ones(len(indices), dtype=np.float64)
+        X = sp.csr_matrix((data, indices, np.asarray(indptr, dtype=np.int64)),
+                          shape=(len(indptr) - 1, len(self.idf)))
+        # Merge repeated tokens into term counts
+        X.sum_duplicates()
+
+        X.data *= self.idf[X.indices]
+        if self.norm == 'l2':
+            row_norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+            row_norms[row_norms == 0.0] = 1.0
+            X.data /= np.repeat(row_norms, np.diff(X.indptr))
+        return X
+
+    def predict_proba_features(self, X):
+        """Run the MLP forward pass on an already vectorized TF-IDF matrix"""
+        hidden_activation = ACTIVATIONS[self.activation]
+        activations = X.astype(self.compute_dtype, copy=False)
+        last = len(self.coefs) - 1
+        for i, (coef, intercept, scale) in enumerate(zip(self.coefs, self.intercepts, self.coef_scales)):
+            if coef.dtype != self.compute_dtype:
+                # Upcast reduced precision weights for this layer only
+                coef = coef.astype(self.compute_dtype)
+            activations = activations @ coef
+            if sp.issparse(activations):
+                activations = activations.toarray()
+            activations = np.asarray(activations)
+            if scale is not None:
+                activations *= scale
+            activations += intercept
+            if i != last:
+                activations = hidden_activation(activations)
+
+        if self.out_activation == 'softmax':
+            return _softmax(activations)
+        output = ACTIVATIONS[self.out_activation](activations)
+        if output.shape[1] == 1:
+            # Binary MLPs have a single logistic output unit for the positive class
+            output = output.ravel()
+            return np.vstack([1 - output, output]).T
+        return output
+
+    @property
+    def weight_nbytes(self):
+        """Bytes used by the MLP weights and biases"""
+        return sum(coef.nbytes for coef in self.coefs) + sum(intercept.nbytes for intercept in self.intercepts)
+
+    def predict_proba(self, texts):
+        """Return the class probability matrix for a list of review texts"""
+        return self.predict_proba_features(self.transform(texts))
+
+    def predict(self, texts):
+        """Return the predicted class label for each text"""
+        return self.classes_[self.predict_proba(texts).argmax(axis=1)]
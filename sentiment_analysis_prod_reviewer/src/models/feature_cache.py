@@ -0,0 +1,131 @@
+"""
+Feature Cache
+
+On-disk cache of vectorized training corpora. An entry holds the fitted
+vectorizer, the sparse train/test matrices as CSR .npz files and the label
+arrays. Entries are keyed by a hash of the raw data file, the sample size,
+the random seed, the preprocessing version and the vectorizer parameters,
+so a repeat training run with the same settings skips CSV parsing,
+deduplication and vectorization entirely.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+DEFAULT_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../output/cache/features'))
+
+# Bump when load_review_split() changes how the raw data is cleaned or split
+PREPROCESSING_VERSION = 2
+
+_DIGEST_MEMO = 'file_digests.json'
+
+
+def file_digest(path, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    SHA-1 of a data file.
+
+    The digest is memoized next to the cache entries by path, size and
+    modification time, so the file is only re-hashed after it changed.
+    """
+    stat = os.stat(path)
+    memo_key = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    memo_path = os.path.join(cache_dir, _DIGEST_MEMO)
+    memo = {}
+    if os.path.exists(memo_path):
+        try:
+            with open(memo_path) as f:
+                memo = json.load(f)
+        except ValueError:
+            memo = {}
+    if memo_key in memo:
+        return memo[memo_key]
+
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    memo[memo_key] = digest.hexdigest()
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(memo_path, 'w') as f:
+        json.dump(memo, f, indent=2)
+    return memo[memo_key]
+
+
+def feature_cache_key(data_path, sample_size, random_state, vectorizer, cache_dir=DEFAULT_CACHE_DIR):
+    """Cache key for one data file, sampling setup and unfitted vectorizer configuration"""
+    params = {name: repr(value) for name, value in vectorizer.get_params(deep=True).items()}
+    payload = json.dumps({
+        'data': file_digest(data_path, cache_dir),
+        'sample_size': sample_size,
+        'random_state': random_state,
+        'preprocessing': PREPROCESSING_VERSION,
+        'vectorizer': type(vectorizer).__name__,
+        'params': params,
+    }, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def load_features(key, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Load a cached entry.
+
+    Returns:
+        tuple: (X_train, X_test, y_train, y_test, vectorizer), or None on a cache miss
+    """
+    entry_dir = os.path.join(cache_dir, key)
+    if not os.path.isdir(entry_dir):
+        return None
+    try:
+        X_train = sp.load_npz(os.path.join(entry_dir, 'X_train.npz'))
+        X_test = sp.load_npz(os.path.join(entry_dir, 'X_test.npz'))
+        y_train = _load_labels(entry_dir, 'y_train')
+        y_test = _load_labels(entry_dir, 'y_test')
+        vectorizer = joblib.load(os.path.join(entry_dir, 'vectorizer.pkl'))
+    except (OSError, ValueError, EOFError) as e:
+        print(f"Ignoring unreadable feature cache entry {key}: {e}")
+        return None
+    print(f"Loaded cached features from {entry_dir}")
+    return X_train, X_test, y_train, y_test, vectorizer
+
+
+def save_features(key, X_train, X_test, y_train, y_test, vectorizer, cache_dir=DEFAULT_CACHE_DIR):
+    """Store an entry; it is written to a temporary directory and renamed into place"""
+    entry_dir = os.path.join(cache_dir, key)
+    tmp_dir = f"{entry_dir}.tmp{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    try:
+        sp.save_npz(os.path.join(tmp_dir, 'X_train.npz'), sp.csr_matrix(X_train))
+        sp.save_npz(os.path.join(tmp_dir, 'X_test.npz'), sp.csr_matrix(X_test))
+        _save_labels(tmp_dir, 'y_train', y_train)
+        _save_labels(tmp_dir, 'y_test', y_test)
+        joblib.dump(vectorizer, os.path.join(tmp_dir, 'vectorizer.pkl'))
+        if os.path.isdir(entry_dir):
+            shutil.rmtree(entry_dir)
+        os.replace(tmp_dir, entry_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print(f"Cached features in {entry_dir}")
+
+
+def clear_feature_cache(cache_dir=DEFAULT_CACHE_DIR):
+    """Remove all cached entries"""
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def _save_labels(entry_dir, name, labels):
+    labels = pd.Series(labels)
+    np.save(os.path.join(entry_dir, f'{name}.npy'), labels.to_numpy().astype(str))
+    np.save(os.path.join(entry_dir, f'{name}_index.npy'), labels.index.to_numpy())
+
+
+def _load_labels(entry_dir, name):
+    values = np.load(os.path.join(entry_dir, f'{name}.npy'), allow_pickle=False)
+    index = np.load(os.path.join(entry_dir, f'{name}_index.npy'), allow_pickle=False)
+    return pd.Series(values, index=index, name='Sentiment')
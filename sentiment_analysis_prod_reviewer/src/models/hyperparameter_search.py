@@ -0,0 +1,371 @@
+"""
+Hyperparameter Search
+
+Successive-halving sweeps over the v1-v5 model families of ai_model.py. All
+configurations of a family start on a small fraction of the training rows;
+after every rung only the best 1/eta by validation F1 move on to eta times
+more rows, until the survivors train on the full split. Trials of a rung run
+in parallel on a process pool over the cached TF-IDF features, and every
+trial is memoized on disk by a hash of its configuration, so a rerun only
+trains trials it has not finished before. The models that reach the full
+split are saved and, once the pool has shut down, timed one at a time in
+the parent process, so their latencies are not skewed by trials training
+on the same cores. The sweep ends with a Pareto table of F1 against
+inference latency per 1k reviews.
+
+Run it from the project root with:
+    python -m src.models.hyperparameter_search
+"""
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+from imblearn.under_sampling import RandomUnderSampler
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import train_test_split
+from sklearn.neural_network import MLPClassifier
+from sklearn.svm import LinearSVC
+from tabulate import tabulate
+
+# Add the project root to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.ai_model import ensure_dir_exists, get_project_root, get_reviews_csv_path, load_and_preprocess_data
+from src.models.feature_cache import PREPROCESSING_VERSION, file_digest
+from src.models.worker_pool import create_pool
+
+DEFAULT_SEARCH_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../output/cache/search'))
+
+# Hyperparameter grid per model family; every family is also searched over MAX_FEATURES_GRID
+SEARCH_SPACES = {
+    'v1': {'C': [0.1, 0.3, 1.0, 3.0, 10.0]},
+    'v2': {'n_estimators': [50, 100, 200], 'max_depth': [None, 50]},
+    'v3': {'C': [0.03, 0.1, 0.3, 1.0]},
+    'v4': {'hidden_layer_sizes': [[50], [100], [200]], 'alpha': [0.0001, 0.001]},
+    'v5': {'hidden_layer_sizes': [[50], [100], [200]], 'alpha': [0.0001, 0.001]},
+}
+MAX_FEATURES_GRID = (5000, 10000)
+
+FAMILY_NAMES = {
+    'v1': "Logistic Regression",
+    'v2': "Random Forest",
+    'v3': "Linear SVC",
+    'v4': "MLP (Imbalanced)",
+    'v5': "MLP (Balanced)",
+}
+
+# Rows scored when measuring inference latency
+LATENCY_ROWS = 1000
+
+
+def build_model(family, params):
+    """Create an unfitted model of a family with the given hyperparameters"""
+    if family == 'v1':
+        return LogisticRegression(C=params['C'], max_iter=100, solver='liblinear', random_state=42)
+    if family == 'v2':
+        # One core per trial; the trials themselves run in parallel
+        return RandomForestClassifier(n_estimators=params['n_estimators'], max_depth=params['max_depth'],
+                                      random_state=42, n_jobs=1)
+    if family == 'v3':
+        linear_svc = LinearSVC(C=params['C'], loss='hinge', max_iter=1000, dual=True, random_state=42)
+        return CalibratedClassifierCV(linear_svc, cv=3)
+    if family in ('v4', 'v5'):
+        return MLPClassifier(hidden_layer_sizes=tuple(params['hidden_layer_sizes']), alpha=params['alpha'],
+                             max_iter=100, solver='adam', random_state=42)
+    raise ValueError(f"Unknown model family: {family!r}")
+
+
+def expand_grid(space):
+    """All parameter combinations of a search space, as dicts"""
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def trial_key(trial, settings):
+    """Stable hash of a trial configuration and the data it trains on"""
+    data_path = get_reviews_csv_path()
+    data = {
+        'sample_size': settings['sample_size'],
+        'random_state': settings['random_state'],
+        'preprocessing': PREPROCESSING_VERSION,
+        'digest': file_digest(data_path) if os.path.exists(data_path) else None,
+    }
+    payload = json.dumps({'trial': trial, 'data': data}, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+# Fit/validation splits per max_features inside worker processes
+# (inherited through fork or loaded by _init_search_worker)
+_search_data = {}
+
+
+def load_search_data(settings, max_features):
+    """
+    Split the cached training features into fit and validation parts.
+
+    The test split of load_and_preprocess_data() is never used for the search.
+    """
+    X_train, _, y_train, _, _ = load_and_preprocess_data(
+        sample_size=settings['sample_size'], random_state=settings['random_state'], max_features=max_features
+    )
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, np.asarray(y_train), test_size=0.2,
+                                                  random_state=settings['random_state'])
+    return X_fit, y_fit, X_val, y_val
+
+
+def _init_search_worker(settings):
+    """Pool initializer: make sure the worker has the feature splits"""
+    for max_features in settings['max_features_grid']:
+        if max_features not in _search_data:
+            # Spawned workers read the features back from the on-disk feature cache
+            _search_data[max_features] = load_search_data(settings, max_features)
+
+
+def _run_trial(task):
+    """
+    Train and evaluate one configuration on its share of the fit rows.
+
+    task is (trial, model_path); the fitted model is saved to model_path when
+    it is set, so the parent can time it after the pool has shut down.
+    """
+    trial, model_path = task
+    X_fit, y_fit, X_val, y_val = _search_data[trial['max_features']]
+    X, y = X_fit[:trial['n_rows']], y_fit[:trial['n_rows']]
+    if trial['family'] == 'v5':
+        X, y = RandomUnderSampler(random_state=42).fit_resample(X, y)
+
+    model = build_model(trial['family'], trial['params'])
+    start = time.perf_counter()
+    model.fit(X, y)
+    fit_seconds = time.perf_counter() - start
+
+    y_pred = model.predict(X_val)
+    if model_path is not None:
+        joblib.dump(model, model_path)
+
+    return {
+        'f1': float(f1_score(y_val, y_pred, pos_label='Positive')),
+        'accuracy': float(accuracy_score(y_val, y_pred)),
+        'fit_seconds': fit_seconds,
+    }
+
+
+def measure_latency(model, X_val):
+    """Best of three predict_proba runs over LATENCY_ROWS validation rows, in ms per 1k reviews"""
+    X_latency = X_val[:LATENCY_ROWS]
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        model.predict_proba(X_latency)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000 * 1000 / X_latency.shape[0]
+
+
+class SuccessiveHalvingSearch:
+    """Parallel, memoized successive-halving sweep over the v1-v5 families"""
+
+    def __init__(self, families=tuple(SEARCH_SPACES), max_features_grid=MAX_FEATURES_GRID, sample_size=50000,
+                 random_state=42, eta=3, min_fraction=1 / 9, n_workers=None, cache_dir=DEFAULT_SEARCH_CACHE_DIR):
+        """
+        Args:
+            families (tuple): Model families to search, keys of SEARCH_SPACES
+            max_features_grid (tuple): TF-IDF vocabulary sizes to try
+            sample_size (int): Passed to load_and_preprocess_data()
+            random_state (int): Seed of the sample and the fit/validation split
+            eta (int): Keep the best 1/eta configurations after each rung and give them eta times more rows
+            min_fraction (float): Share of the fit rows used by the first rung
+            n_workers (int): Worker processes (defaults to all cores)
+            cache_dir (str): Directory of the memoized trial results
+        """
+        self.families = tuple(families)
+        self.settings = {
+            'sample_size': sample_size,
+            'random_state': random_state,
+            'max_features_grid': list(max_features_grid),
+        }
+        self.eta = eta
+        self.min_fraction = min_fraction
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        self._pool = None
+
+    def rung_fractions(self):
+        """Share of the fit rows used at each rung, ending with the full split"""
+        fractions = []
+        fraction = self.min_fraction
+        while fraction < 1:
+            fractions.append(fraction)
+            fraction *= self.eta
+        return fractions + [1.0]
+
+    def _cached(self, key):
+        path = os.path.join(self.cache_dir, f'{key}.json')
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return None
+
+    def _model_path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.pkl')
+
+    def _store(self, key, result):
+        ensure_dir_exists(self.cache_dir)
+        with open(os.path.join(self.cache_dir, f'{key}.json'), 'w') as f:
+            json.dump(result, f, indent=2)
+
+    def _run_rung(self, trials, save_models=False):
+        """
+        Return results for a list of trials, training only the ones not memoized.
+
+        With save_models the fitted models are kept in the cache directory;
+        trials whose model file is missing are trained again.
+        """
+        keys = [trial_key(trial, self.settings) for trial in trials]
+        results = [self._cached(key) for key in keys]
+        missing = [i for i, result in enumerate(results)
+                   if result is None or (save_models and not os.path.exists(self._model_path(keys[i])))]
+        print(f"Rung trials: {len(trials)}, memoized: {len(trials) - len(missing)}")
+
+        if missing:
+            if self._pool is None:
+                # Start the workers only once something has to be trained; under fork
+                # they inherit the feature splits loaded here
+                self._pool = create_pool(self.n_workers, initializer=_init_search_worker, initargs=(self.settings,),
+                                         prepare_parent=lambda: _init_search_worker(self.settings))
+            ensure_dir_exists(self.cache_dir)
+            tasks = [(trials[i], self._model_path(keys[i]) if save_models else None) for i in missing]
+            outputs = self._pool.map(_run_trial, tasks, chunksize=1)
+            for i, output in zip(missing, outputs):
+                results[i] = dict(trials[i], **output)
+                self._store(keys[i], results[i])
+        if save_models:
+            for key, result in zip(keys, results):
+                result['model_path'] = self._model_path(key)
+        return results
+
+    def run(self):
+        """
+        Run the sweep for all families and save the Pareto table.
+
+        Returns:
+            list: Result dicts of the configurations that reached the full split
+        """
+        n_fit_rows = None
+        survivors = {
+            family: [{'family': family, 'params': params, 'max_features': max_features}
+                     for max_features in self.settings['max_features_grid']
+                     for params in expand_grid(SEARCH_SPACES[family])]
+            for family in self.families
+        }
+
+        try:
+            for rung, fraction in enumerate(self.rung_fractions()):
+                if n_fit_rows is None:
+                    n_fit_rows = self._fit_row_count()
+                n_rows = max(int(n_fit_rows * fraction), 100)
+                print(f"\nRung {rung}: {n_rows} training rows")
+                trials = [dict(config, n_rows=n_rows) for configs in survivors.values() for config in configs]
+                results = self._run_rung(trials, save_models=fraction >= 1)
+
+                if fraction >= 1:
+                    final = results
+                    break
+                # Keep the best 1/eta configurations of every family
+                for family in survivors:
+                    ranked = sorted((r for r in results if r['family'] == family), key=lambda r: -r['f1'])
+                    keep = max(1, math.ceil(len(ranked) / self.eta))
+                    survivors[family] = [{'family': family, 'params': r['params'], 'max_features': r['max_features']}
+                                         for r in ranked[:keep]]
+        finally:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+
+        # Time the finalists only now, one at a time, with no trial training next to them
+        print(f"\nTiming {len(final)} final configurations...")
+        for result in final:
+            X_val = self._validation_rows(result['max_features'])
+            result['latency_ms_per_1k'] = measure_latency(joblib.load(result.pop('model_path')), X_val)
+
+        self.save_pareto_table(final)
+        return final
+
+    def _validation_rows(self, max_features):
+        """Validation features of one vocabulary size, loaded in the parent if needed"""
+        if max_features not in _search_data:
+            _search_data[max_features] = load_search_data(self.settings, max_features)
+        return _search_data[max_features][2]
+
+    def _fit_row_count(self):
+        """Number of fit rows; the cheapest way to know it is to load the smallest feature set"""
+        max_features = self.settings['max_features_grid'][0]
+        if max_features not in _search_data:
+            _search_data[max_features] = load_search_data(self.settings, max_features)
+        return _search_data[max_features][0].shape[0]
+
+    @staticmethod
+    def pareto_front(results):
+        """Results not dominated by another with higher-or-equal F1 and lower-or-equal latency"""
+        front = []
+        for result in results:
+            dominated = any(
+                other['f1'] >= result['f1'] and other['latency_ms_per_1k'] <= result['latency_ms_per_1k'] and
+                (other['f1'] > result['f1'] or other['latency_ms_per_1k'] < result['latency_ms_per_1k'])
+                for other in results
+            )
+            if not dominated:
+                front.append(result)
+        return front
+
+    def save_pareto_table(self, results):
+        """Print and save all full-split results sorted by latency, marking the Pareto-optimal ones"""
+        front = self.pareto_front(results)
+        data = []
+        for result in sorted(results, key=lambda r: r['latency_ms_per_1k']):
+            params = ', '.join(f"{name}={value}" for name, value in sorted(result['params'].items()))
+            data.append([
+                "*" if result in front else "",
+                FAMILY_NAMES.get(result['family'], result['family']),
+                params,
+                result['max_features'],
+                f"{result['f1']:.4f}",
+                f"{result['accuracy']:.4f}",
+                f"{result['latency_ms_per_1k']:.2f}",
+                f"{result['fit_seconds']:.1f}",
+            ])
+        headers = ["Pareto", "Model", "Parameters", "Max Features", "F1 Score", "Accuracy",
+                   "ms / 1k reviews", "Fit (s)"]
+        table = tabulate(data, headers=headers, tablefmt="grid")
+        print("\n" + "=" * 80)
+        print("HYPERPARAMETER SEARCH: F1 VS INFERENCE LATENCY")
+        print("=" * 80)
+        print(table)
+
+        output_dir = os.path.join(get_project_root(), 'output', 'results')
+        ensure_dir_exists(output_dir)
+        output_path = os.path.join(output_dir, 'search_pareto_results.txt')
+        with open(output_path, 'w') as f:
+            f.write("HYPERPARAMETER SEARCH: F1 VS INFERENCE LATENCY\n")
+            f.write("Latency is model inference on vectorized validation reviews (vectorization excluded)\n")
+            f.write("=" * 80 + "\n")
+            f.write(table)
+        print(f"\nPareto table saved to '{output_path}'")
+
+
+def main():
+    SuccessiveHalvingSearch().run()
+
+
+if __name__ == "__main__":
+    main()
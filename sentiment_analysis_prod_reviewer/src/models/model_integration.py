@@ -1,164 +1,970 @@
-import joblib
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import cycle, islice
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.graph_objects as go
 
+# Add the project root to sys.path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.fast_engine import ENGINE_DIRNAME, ENGINE_FILENAME, FastSentimentEngine, export_fast_engine
+from src.models.model_registry import (CASCADE_MODEL_FILENAME, DEFAULT_MODEL_DIR, DEFAULT_MODEL_NAME, get_cascade_model,
+                                      get_model_artifacts, read_model_name)
+from src.models.text_preprocessing import deduplicate_texts, normalize_review_text
+
+# Stages that can decide a review in cascade mode, indexed by the stage id
+CASCADE_STAGES = np.array(['linear', 'mlp'])
+
+# Tokenizer and default lexicon for the fallback analysis used when no model is available
+_WORD_RE = re.compile(r'\b\w+\b')
+
+# Synthetic reviews scored by SentimentAnalyzer.warmup()
+WARMUP_REVIEWS = [
+    {'body': 'Click to play video This product is amazing! It works perfectly and I love it.', 'rating': 5},
+    {'body': 'I am disappointed with this product. It broke after one use.', 'rating': 2},
+    {'body': 'Great value for money, highly recommend it to anyone.', 'rating': 4},
+    {'body': 'Terrible quality, it does not work as advertised.', 'rating': 1},
+]
+
+DEFAULT_LEXICON = {
+    **{word: 1.0 for word in ['good', 'great', 'excellent', 'amazing', 'love', 'best', 'awesome', 'perfect']},
+    **{word: -1.0 for word in ['bad', 'poor', 'terrible', 'awful', 'hate', 'worst', 'disappointing', 'broken']},
+}
+
+
+@lru_cache(maxsize=8)
+def load_lexicon(path):
+    """
+    Load a weighted sentiment lexicon for the fallback analysis.
+
+    Each non-empty line holds a word and its weight separated by a tab, comma
+    or spaces (e.g. the AFINN format "excellent\t3"). Lines starting with '#'
+    and multi-word entries are ignored.
+
+    Args:
+        path (str): Path to the lexicon file
+
+    Returns:
+        dict: Mapping of lowercase word to weight (positive > 0 > negative)
+    """
+    lexicon = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = re.split(r'\s*[\t,]\s*|\s+', line)
+            if len(parts) != 2:
+                continue
+            word, weight = parts
+            try:
+                lexicon[word.lower()] = float(weight)
+            except ValueError:
+                continue
+    print(f"Loaded {len(lexicon)} lexicon words from '{path}'")
+    return lexicon
+
+
+class SentimentTotals:
+    """Running sentiment counts and confidence sum that chunks can be folded into"""
+
+    def __init__(self, positive_count=0, negative_count=0, confidence_sum=0.0):
+        self.positive_count = positive_count
+        self.negative_count = negative_count
+        self.confidence_sum = confidence_sum
+
+    @property
+    def total(self):
+        return self.positive_count + self.negative_count
+
+    def add(self, is_positive, confidences):
+        """Fold per-review label and confidence arrays into the totals"""
+        positive = int(np.count_nonzero(is_positive))
+        self.positive_count += positive
+        self.negative_count += len(is_positive) - positive
+        self.confidence_sum += float(np.sum(confidences))
+        return self
+
+    def add_results(self, results):
+        """Fold an analyze_reviews result dict into the totals"""
+        count = results['positive_count'] + results['negative_count']
+        self.positive_count += results['positive_count']
+        self.negative_count += results['negative_count']
+        self.confidence_sum += results.get('average_confidence', 0.5) * count
+        return self
+
+    def merge(self, other):
+        """Add another SentimentTotals into this one"""
+        self.positive_count += other.positive_count
+        self.negative_count += other.negative_count
+        self.confidence_sum += other.confidence_sum
+        return self
+
+    def to_summary(self, model_name=DEFAULT_MODEL_NAME):
+        """Return the totals in the same format analyze_reviews uses"""
+        total = self.total
+        if total == 0:
+            overall_sentiment, score, avg_confidence = 'neutral', 0.5, 0.5
+        else:
+            score = self.positive_count / total
+            overall_sentiment = 'positive' if score >= 0.5 else 'negative'
+            avg_confidence = self.confidence_sum / total
+        return {
+            'overall_sentiment': overall_sentiment,
+            'score': score,
+            'positive_count': self.positive_count,
+            'negative_count': self.negative_count,
+            'average_confidence': avg_confidence,
+            'detailed_results': [],
+            'model_name': model_name
+        }
+
+
+def _review_record(review, positive, confidence, strength, stage=None):
+    """Per-review result dict in the detailed_results format"""
+    record = {
+        'review': review.get('body', ''),
+        'sentiment': 'positive' if positive else 'negative',
+        'confidence': float(confidence),
+        'sentiment_strength': str(strength),
+        'rating': review.get('rating', None),
+        'helpful_votes': review.get('helpful_votes', 0)
+    }
+    if stage is not None:
+        # Which cascade stage decided this review
+        record['stage'] = str(stage)
+    return record
+
+
+def _check_top_k(top_k):
+    """Reject a top_k before any scoring is done"""
+    if top_k is not None and top_k < 1:
+        raise ValueError("top_k must be at least 1")
+
+
+def strength_codes(confidences):
+    """Code of the sentiment strength bucket (see AnalysisResult.STRENGTHS) per confidence"""
+    return (confidences > 0.6).astype(np.int8) + (confidences > 0.8)
+
+
+class AnalysisResult:
+    """
+    Columnar per-review analysis results.
+
+    Rows are kept most confident first as NumPy arrays with int8-coded
+    sentiment and strength categories. Review text, rating and helpful votes
+    are referenced by index into the original reviews list instead of being
+    copied into every row. to_records() returns the classic list of dicts.
+    """
+
+    SENTIMENTS = np.array(['negative', 'positive'])
+    STRENGTHS = np.array(['weak', 'moderate', 'strong'])
+
+    def __init__(self, reviews, review_index, sentiment_codes, confidences, strength_codes, stage_codes=None):
+        self.reviews = reviews
+        self.review_index = review_index
+        self.sentiment_codes = sentiment_codes
+        self.confidences = confidences
+        self.strength_codes = strength_codes
+        self.stage_codes = stage_codes
+
+    @classmethod
+    def from_arrays(cls, reviews, is_positive, confidences, strengths, stages=None, sort=True):
+        """
+        Build a result from per-review arrays in input order.
+
+        Args:
+            reviews (list): The analyzed review dicts (referenced, not copied)
+            is_positive (array): True where the review is positive
+            confidences (array): Probability of the predicted class
+            strengths (array): Strength codes, see strength_codes()
+            stages (array): Optional cascade stage codes
+            sort (bool): Order rows most confident first (stable among ties)
+        """
+        if sort:
+            order = np.argsort(-confidences, kind='stable').astype(np.int32)
+        else:
+            order = np.arange(len(confidences), dtype=np.int32)
+        return cls(
+            reviews,
+            order,
+            np.asarray(is_positive, dtype=np.int8)[order],
+            np.asarray(confidences, dtype=np.float64)[order],
+            np.asarray(strengths, dtype=np.int8)[order],
+            np.asarray(stages, dtype=np.int8)[order] if stages is not None else None
+        )
+
+    def __len__(self):
+        return len(self.review_index)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        stage = CASCADE_STAGES[self.stage_codes[position]] if self.stage_codes is not None else None
+        return _review_record(
+            self.reviews[self.review_index[position]],
+            self.sentiment_codes[position],
+            self.confidences[position],
+            self.STRENGTHS[self.strength_codes[position]],
+            stage
+        )
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    @property
+    def sentiments(self):
+        """Sentiment label per row"""
+        return self.SENTIMENTS[self.sentiment_codes]
+
+    def to_records(self):
+        """Return the rows as the list of dicts analyze_reviews used to produce"""
+        return list(self)
+
+    def to_frame(self):
+        """Return the columns as a DataFrame with categorical labels (text stays referenced by index)"""
+        frame = pd.DataFrame({
+            'review_index': self.review_index,
+            'sentiment': pd.Categorical.from_codes(self.sentiment_codes, self.SENTIMENTS),
+            'confidence': self.confidences,
+            'sentiment_strength': pd.Categorical.from_codes(self.strength_codes, self.STRENGTHS),
+        })
+        if self.stage_codes is not None:
+            frame['stage'] = pd.Categorical.from_codes(self.stage_codes, CASCADE_STAGES)
+        return frame
+
+    def to_columns(self):
+        """Return the arrays as a JSON-serializable dict of lists, see from_columns()"""
+        columns = {
+            'review_index': self.review_index.tolist(),
+            'sentiment_codes': self.sentiment_codes.tolist(),
+            'confidences': self.confidences.tolist(),
+            'strength_codes': self.strength_codes.tolist(),
+        }
+        if self.stage_codes is not None:
+            columns['stage_codes'] = self.stage_codes.tolist()
+        return columns
+
+    @classmethod
+    def from_columns(cls, reviews, columns):
+        """Rebuild a result for the given reviews from to_columns() output"""
+        stage_codes = columns.get('stage_codes')
+        return cls(
+            reviews,
+            np.asarray(columns['review_index'], dtype=np.int32),
+            np.asarray(columns['sentiment_codes'], dtype=np.int8),
+            np.asarray(columns['confidences'], dtype=np.float64),
+            np.asarray(columns['strength_codes'], dtype=np.int8),
+            np.asarray(stage_codes, dtype=np.int8) if stage_codes is not None else None
+        )
+
+
+class PredictionCache:
+    """
+    Content-addressed cache of predict_proba rows for review texts.
+
+    Entries are keyed by a hash of the normalized review text plus a model
+    fingerprint, so a retrained model never reuses stale predictions. Lookups
+    go to an in-memory LRU tier first and then to an optional SQLite tier.
+    """
+
+    # SQLite limits the number of bound parameters per statement
+    _SQL_BATCH_SIZE = 500
+
+    def __init__(self, max_entries=100000, db_path=None):
+        """
+        Args:
+            max_entries (int): Capacity of the in-memory LRU tier
+            db_path (str): Optional SQLite file for the persistent tier
+        """
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, proba BLOB NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def normalize_text(text):
+        """Lowercase and collapse whitespace; neither changes the TF-IDF features"""
+        return ' '.join(str(text).lower().split())
+
+    @classmethod
+    def make_key(cls, text, fingerprint):
+        """Cache key for a review text scored by the model with the given fingerprint"""
+        payload = f"{fingerprint}\0{cls.normalize_text(text)}".encode('utf-8')
+        return hashlib.sha1(payload).hexdigest()
+
+    def get_many(self, keys):
+        """
+        Look up several keys at once.
+
+        Returns:
+            dict: Mapping of found keys to their probability rows
+        """
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                if key in found:
+                    continue
+                row = self._memory.get(key)
+                if row is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = row
+                else:
+                    missing.append(key)
+            
+            if self._db is not None and missing:
+                missing = list(dict.fromkeys(missing))
+                for start in range(0, len(missing), self._SQL_BATCH_SIZE):
+                    batch = missing[start:start + self._SQL_BATCH_SIZE]
+                    placeholders = ','.join('?' * len(batch))
+                    rows = self._db.execute(
+                        f"SELECT key, proba FROM predictions WHERE key IN ({placeholders})", batch
+                    ).fetchall()
+                    for key, blob in rows:
+                        row = np.frombuffer(blob, dtype=np.float64)
+                        found[key] = row
+                        self._remember(key, row)
+            
+            for key in keys:
+                if key in found:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        return found
+
+    def put_many(self, items):
+        """Store (key, probability row) pairs in every tier"""
+        items = [(key, np.asarray(row, dtype=np.float64)) for key, row in items]
+        with self._lock:
+            for key, row in items:
+                self._remember(key, row)
+            if self._db is not None and items:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO predictions (key, proba) VALUES (?, ?)",
+                    [(key, row.tobytes()) for key, row in items]
+                )
+                self._db.commit()
+
+    def _remember(self, key, row):
+        """Insert into the LRU tier, evicting the least recently used entries"""
+        self._memory[key] = row
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self):
+        """Return hit/miss counters and the current in-memory size"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'memory_entries': len(self._memory)
+        }
+
+    def close(self):
+        """Close the SQLite tier, if any"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        with self._lock:
+            self._memory.clear()
+            self.hits = 0
+            self.misses = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions")
+                self._db.commit()
+
+
+def model_fingerprint(model_dir=DEFAULT_MODEL_DIR, weight_dtype=None, cascade=False):
+    """
+    Hash of the model and vectorizer files, used to namespace cached predictions.
+
+    With cascade the linear first-stage model is hashed too, so swapping it
+    invalidates the cached cascade rows.
+    """
+    digest = hashlib.sha1()
+    engine_dirname = f'{ENGINE_DIRNAME}_{weight_dtype}' if weight_dtype else ENGINE_DIRNAME
+    engine_dir = os.path.join(model_dir, engine_dirname)
+    engine_files = sorted(os.listdir(engine_dir)) if os.path.isdir(engine_dir) else []
+    for filename in [os.path.join(engine_dirname, name) for name in engine_files] + \
+            [ENGINE_FILENAME, 'sentiment_model.pkl', 'vectorizer.pkl'] + ([CASCADE_MODEL_FILENAME] if cascade else []):
+        path = os.path.join(model_dir, filename)
+        if not os.path.isfile(path):
+            continue
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def quantized_engine_path(weight_dtype, model_dir=DEFAULT_MODEL_DIR):
+    """Directory holding the engine exported with the given weight dtype"""
+    return os.path.join(model_dir, f'{ENGINE_DIRNAME}_{weight_dtype}')
+
+
+def export_quantized_model(model, vectorizer, weight_dtype='int8', model_dir=DEFAULT_MODEL_DIR):
+    """
+    Export the MLP with float32, float16 or int8 weights for inference.
+
+    Load it with SentimentAnalyzer(weight_dtype=...). Run
+    check_quantization_accuracy() first to confirm predictions hold up.
+
+    Returns:
+        str: Path of the exported engine directory
+    """
+    path = quantized_engine_path(weight_dtype, model_dir)
+    export_fast_engine(model, vectorizer, path, weight_dtype=weight_dtype)
+    return path
+
+
+def check_quantization_accuracy(model, vectorizer, X_test, y_test, weight_dtypes=('float32', 'float16', 'int8')):
+    """
+    Compare reduced precision engines against the float64 MLP on a held-out split.
+
+    Args:
+        model: Fitted MLPClassifier (the float64 reference)
+        vectorizer: Fitted TfidfVectorizer used to build X_test
+        X_test: TF-IDF matrix of the held-out reviews, e.g. from load_and_preprocess_data()
+        y_test: True sentiment labels for X_test
+        weight_dtypes (tuple): Weight storage types to check
+
+    Returns:
+        list: One dict per dtype with accuracy, agreement with the float64
+              predictions, largest probability difference and weight size
+    """
+    reference_proba = model.predict_proba(X_test)
+    reference_pred = np.asarray(model.classes_)[reference_proba.argmax(axis=1)].astype(str)
+    y_true = np.asarray(y_test).astype(str)
+    reference_bytes = FastSentimentEngine.from_model(model, vectorizer, 'float64').weight_nbytes
+    
+    results = []
+    for weight_dtype in ('float64',) + tuple(weight_dtypes):
+        engine = FastSentimentEngine.from_model(model, vectorizer, weight_dtype)
+        proba = engine.predict_proba_features(X_test)
+        pred = engine.classes_[proba.argmax(axis=1)]
+        results.append({
+            'weight_dtype': weight_dtype,
+            'accuracy': float(np.mean(pred == y_true)),
+            'agreement': float(np.mean(pred == reference_pred)),
+            'max_probability_diff': float(np.abs(proba - reference_proba).max()),
+            'weight_bytes': engine.weight_nbytes,
+            'compression': reference_bytes / engine.weight_nbytes
+        })
+    return results
+
+
+def iter_reviews_from_csv(paths, chunksize=10000):
+    """
+    Yield review dicts from scraped review CSV files (e.g. output/data/*.csv)
+    without loading whole files into memory. Files without a 'body' column,
+    such as the product search results, are skipped.
+
+    Args:
+        paths (str or list): One CSV path or a list of paths
+        chunksize (int): Number of rows read from disk at a time
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    for path in paths:
+        for frame in pd.read_csv(path, usecols=lambda c: c in ('body', 'rating'), chunksize=chunksize):
+            if 'body' not in frame:
+                print(f"Skipping '{path}': no 'body' column")
+                break
+            bodies = frame['body'].fillna('').astype(str)
+            ratings = frame['rating'] if 'rating' in frame else [None] * len(frame)
+            for body, rating in zip(bodies, ratings):
+                yield {'body': body, 'rating': None if pd.isna(rating) else rating}
+
 class SentimentAnalyzer:
-    def __init__(self):
-        # Load the trained model and related objects
-        import os
-        model_dir = os.path.dirname(os.path.abspath(__file__))
+    def __init__(self, model_dir=DEFAULT_MODEL_DIR, cache=None, lexicon_path=None, weight_dtype=None,
+                 cascade_band=None, deduplicate=True, near_duplicates=False):
+        """
+        Args:
+            model_dir (str): Directory containing the saved model files
+            cache (PredictionCache): Optional cache of predictions per review text
+            lexicon_path (str): Optional lexicon file for the fallback analysis,
+                see load_lexicon(); the built-in word list is used otherwise
+            weight_dtype (str): Serve the engine exported by export_quantized_model()
+                with this weight dtype ('float32', 'float16' or 'int8')
+            cascade_band (tuple): (low, high) positive-class probability band. When set,
+                the linear model saved as cascade_model.pkl scores every review first and
+                only reviews inside the band are re-scored by the deployed model.
+            deduplicate (bool): Score review texts that are identical after
+                normalization once and copy the result to the duplicates
+            near_duplicates (bool): Also group near-duplicate texts by SimHash, see
+                deduplicate_texts(). Off by default: fingerprinting costs more than
+                scoring on typical batches. A near-duplicate gets its group
+                representative's sentiment and confidence in 'detailed_results'.
+        """
+        # The trained model and related objects are loaded lazily on first use
+        # and shared across all analyzers through the process-wide registry
+        self.model_dir = model_dir
+        self.cache = cache
+        self.lexicon_path = lexicon_path
+        self.weight_dtype = weight_dtype
+        self.cascade_band = tuple(cascade_band) if cascade_band is not None else None
+        self.deduplicate = deduplicate
+        self.near_duplicates = near_duplicates
+        self._artifacts = None
+        self._fingerprint = None
+        self._ready = threading.Event()
+        self._warmup_thread = None
+
+    def _ensure_loaded(self):
+        """Fetch the shared model artifacts, loading them on the first call"""
+        if self._artifacts is None:
+            artifacts = get_model_artifacts(self.model_dir, self.weight_dtype)
+            if artifacts.error is not None:
+                # If the model files don't exist, fall back to the lexicon-based analysis;
+                # the load is retried on the next call in case the model appears
+                print("Using fallback model...")
+                return artifacts
+            self._artifacts = artifacts
+        return self._artifacts
+
+    @property
+    def model(self):
+        return self._ensure_loaded().model
+
+    @property
+    def vectorizer(self):
+        return self._ensure_loaded().vectorizer
+
+    @property
+    def label_encoder(self):
+        return self._ensure_loaded().label_encoder
+
+    @property
+    def engine(self):
+        return self._ensure_loaded().engine
+
+    @property
+    def model_name(self):
+        """Display name of the deployed model, from the metadata saved with the artifacts"""
+        return self._ensure_loaded().model_name or read_model_name(self.model_dir)
+
+    @property
+    def cascade_model(self):
+        return get_cascade_model(self.model_dir) if self.cascade_band is not None else None
+
+    def _has_model(self):
+        """True when either the fast engine or the sklearn model loaded"""
+        artifacts = self._ensure_loaded()
+        return artifacts.engine is not None or (artifacts.vectorizer is not None and
+                                                artifacts.label_encoder is not None)
+
+    @property
+    def is_ready(self):
+        """True once warmup() has finished, so requests no longer pay cold-start costs"""
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout=None):
+        """Block until warmup() has finished; returns is_ready"""
+        return self._ready.wait(timeout)
+
+    def warmup(self, batch_size=64, background=False):
+        """
+        Load the model and run a synthetic batch through the whole scoring path.
+
+        This pays the one-off costs of the first request up front: loading the
+        artifacts, scikit-learn/NumPy first-call paths, BLAS thread start-up and
+        building the first plotly figures. The prediction cache is bypassed so
+        the synthetic reviews are not stored.
+
+        Args:
+            batch_size (int): Number of synthetic reviews to score
+            background (bool): Run in a daemon thread and return immediately;
+                check is_ready or call wait_until_ready()
+        """
+        if background:
+            if self._warmup_thread is None and not self.is_ready:
+                self._warmup_thread = threading.Thread(target=self.warmup, args=(batch_size,), daemon=True)
+                self._warmup_thread.start()
+            return
         
+        if self.is_ready:
+            return
+        start = time.perf_counter()
+        reviews = list(islice(cycle(WARMUP_REVIEWS), max(batch_size, 1)))
         try:
-            print("Loading sentiment analysis model...")
-            self.model = joblib.load(os.path.join(model_dir, 'sentiment_model.pkl'))
-            self.vectorizer = joblib.load(os.path.join(model_dir, 'vectorizer.pkl'))
-            self.label_encoder = joblib.load(os.path.join(model_dir, 'label_encoder.pkl'))
-            print("MLP (Imbalanced) model loaded successfully!")
+            results = self._warm_scoring(reviews)
+            self.create_visualizations(results)
         except Exception as e:
-            print(f"Error loading model: {e}")
-            print("Using fallback model...")
-            # If the model files don't exist, create a simple fallback model
-            from sklearn.linear_model import LogisticRegression
-            self.model = LogisticRegression()
-            self.vectorizer = None
-            self.label_encoder = None
+            # A failed warmup only means the first request is slower
+            print(f"Warmup failed: {e}")
+        self._ready.set()
+        print(f"Sentiment analyzer warmed up in {time.perf_counter() - start:.2f}s")
+
+    def _warm_scoring(self, reviews):
+        """Score the synthetic reviews without touching the prediction cache"""
+        self._ensure_loaded()
+        if not self._has_model():
+            return self._fallback_analysis(reviews)
+        # Single review first, then the batch, to warm both small and large matrix paths
+        self._score_texts([normalize_review_text(reviews[0]['body'])])
+        unique_texts, inverse = deduplicate_texts([review['body'] for review in reviews], self.near_duplicates)
+        probabilities, stages = self._score_texts(unique_texts)
+        is_positive, confidences = self._decode_probabilities(probabilities[inverse])
+        return self._build_results(reviews, is_positive, confidences, True,
+                                   stages[inverse] if stages is not None else None)
         
-    def analyze_reviews(self, reviews):
+    def analyze_reviews(self, reviews, include_details=True, top_k=None, columnar=False):
         """
         Analyze a list of review texts and return sentiment analysis results
+
+        Args:
+            reviews (list): Review dicts with at least a 'body' key
+            include_details (bool): Build the per-review 'detailed_results' list.
+                Pass False when only the aggregate counts and score are needed.
+            top_k (int): Instead of the full detailed_results, return 'top_reviews'
+                with the k most and k least confident reviews per sentiment.
+                Only the selected rows are turned into dicts.
+            columnar (bool): Return 'detailed_results' as an AnalysisResult backed by
+                NumPy arrays instead of a list of dicts
+
+        Raises:
+            ValueError: If top_k is less than 1
         """
+        _check_top_k(top_k)
         if not reviews:
-            return {
+            results = {
                 'overall_sentiment': 'neutral',
                 'score': 0.5,
                 'positive_count': 0,
                 'negative_count': 0,
                 'detailed_results': [],
-                'model_name': 'MLP (Imbalanced)'
+                'model_name': self.model_name
             }
+            if top_k is not None:
+                results['top_reviews'] = {sentiment: {'most_confident': [], 'least_confident': []}
+                                          for sentiment in ('positive', 'negative')}
+            return results
         
-        if self.vectorizer is None or self.label_encoder is None:
+        if not self._has_model():
             # Fallback mode - simple sentiment analysis
-            return self._fallback_analysis(reviews)
+            return self._fallback_analysis(reviews, top_k, columnar)
             
         try:
-            # Transform and predict each review using our trained model
+            # Score every review with a single predict_proba pass over the TF-IDF matrix
             texts = [review.get('body', '') for review in reviews]
-            X_tfidf = self.vectorizer.transform(texts)
-            predictions = self.model.predict(X_tfidf)
-            probabilities = self.model.predict_proba(X_tfidf)
-            
-            # Convert predictions back to labels
-            try:
-                # Try to directly map the predictions to labels without using the encoder
-                # This avoids the case sensitivity issue completely
-                sentiments = ['positive' if p == 1 else 'negative' for p in predictions]
-                print(f"Successfully mapped predictions to labels directly")
-            except Exception as e:
-                print(f"Error in direct label mapping: {e}")
-                try:
-                    # Fall back to using the encoder if direct mapping fails
-                    sentiments = self.label_encoder.inverse_transform(predictions)
-                    # Convert all labels to lowercase for consistency
-                    sentiments = [s.lower() if isinstance(s, str) else s for s in sentiments]
-                except Exception as e:
-                    print(f"Error transforming labels with encoder: {e}")
-                    # Last resort fallback
-                    sentiments = ['positive' if p == 1 else 'negative' for p in predictions]
-            
-            # Count positive and negative reviews - ensure case-insensitive comparison
-            positive_count = sum(1 for s in sentiments if str(s).lower() == 'positive')
-            negative_count = sum(1 for s in sentiments if str(s).lower() == 'negative')
-            total = positive_count + negative_count
-            
-            # Calculate overall sentiment score
-            score = positive_count / total if total > 0 else 0.5
-            overall_sentiment = 'positive' if score >= 0.5 else 'negative'
-            
-            # Calculate confidence levels
-            avg_confidence = float(sum(prob.max() for prob in probabilities) / len(probabilities)) if probabilities.size > 0 else 0.5
-            
-            # Prepare detailed results
-            detailed_results = []
-            for i, (review, sentiment, prob) in enumerate(zip(reviews, sentiments, probabilities)):
-                confidence = prob.max()
-                sentiment_strength = 'strong' if confidence > 0.8 else 'moderate' if confidence > 0.6 else 'weak'
-                
-                detailed_results.append({
-                    'review': review.get('body', ''),
-                    'sentiment': sentiment,
-                    'confidence': float(confidence),
-                    'sentiment_strength': sentiment_strength,
-                    'rating': review.get('rating', None),
-                    'helpful_votes': review.get('helpful_votes', 0)
-                })
-                
-            # Sort by confidence (most confident first)
-            detailed_results.sort(key=lambda x: x['confidence'], reverse=True)
-            
-            return {
-                'overall_sentiment': overall_sentiment,
-                'score': score,
-                'positive_count': positive_count,
-                'negative_count': negative_count,
-                'average_confidence': avg_confidence,
-                'detailed_results': detailed_results,
-                'model_name': 'MLP (Imbalanced)'
-            }
+            probabilities, stages = self._predict_proba(texts)
+            is_positive, confidences = self._decode_probabilities(probabilities)
+            return self._build_results(reviews, is_positive, confidences, include_details, stages, top_k, columnar)
             
         except Exception as e:
             print(f"Error during sentiment analysis: {e}")
-            return self._fallback_analysis(reviews)
-            
-    def _fallback_analysis(self, reviews):
-        """Simple fallback sentiment analysis when model loading fails"""
-        import re
+            return self._fallback_analysis(reviews, top_k, columnar)
+
+    def analyze_review_batches(self, review_lists, include_details=True, top_k=None, columnar=False,
+                               return_exceptions=False):
+        """
+        Analyze several independent review lists with a single vectorized model call.
+
+        If the combined call fails, e.g. because one list holds malformed
+        reviews, every list is analyzed on its own so the others still succeed.
+
+        Args:
+            review_lists (list): Lists of review dicts, e.g. one per request
+            include_details (bool): Build 'detailed_results' for each list
+            top_k (int): Return 'top_reviews' per list instead, see analyze_reviews()
+            columnar (bool): Return each 'detailed_results' as an AnalysisResult
+            return_exceptions (bool): Put the exception of a list that cannot be
+                analyzed in its slot instead of raising it
+
+        Returns:
+            list: One analyze_reviews() result dict per input list
+
+        Raises:
+            ValueError: If top_k is less than 1
+        """
+        _check_top_k(top_k)
+        if not self._has_model():
+            return self._analyze_each(review_lists, include_details, top_k, columnar, return_exceptions)
         
-        positive_words = ['good', 'great', 'excellent', 'amazing', 'love', 'best', 'awesome', 'perfect']
-        negative_words = ['bad', 'poor', 'terrible', 'awful', 'hate', 'worst', 'disappointing', 'broken']
+        try:
+            texts = [review.get('body', '') for reviews in review_lists for review in reviews]
+            probabilities, stages = self._predict_proba(texts) if texts else (None, None)
+        except Exception as e:
+            print(f"Error during batched sentiment analysis ({e}), analyzing each review list separately...")
+            return self._analyze_each(review_lists, include_details, top_k, columnar, return_exceptions)
+        
+        results = []
+        offset = 0
+        for reviews in review_lists:
+            if not reviews:
+                results.append(self.analyze_reviews(reviews, top_k=top_k))
+                continue
+            batch = slice(offset, offset + len(reviews))
+            is_positive, confidences = self._decode_probabilities(probabilities[batch])
+            results.append(self._build_results(reviews, is_positive, confidences, include_details,
+                                               stages[batch] if stages is not None else None, top_k, columnar))
+            offset += len(reviews)
+        return results
+
+    def _analyze_each(self, review_lists, include_details, top_k, columnar, return_exceptions):
+        """Analyze review lists one at a time so a failing list does not fail the others"""
+        results = []
+        for reviews in review_lists:
+            try:
+                results.append(self.analyze_reviews(reviews, include_details, top_k, columnar))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def _predict_proba(self, texts):
+        """
+        Score a list of review texts.
+
+        Texts are normalized and, unless deduplicate is off, only one text per
+        group of duplicates is scored and its scores are broadcast to the group
+        (exact duplicates only, unless near_duplicates is on).
+
+        Returns:
+            tuple: (class probability matrix, cascade stage per text or None
+                    when the cascade is disabled)
+        """
+        if not self.deduplicate:
+            return self._predict_unique([normalize_review_text(text) for text in texts])
+        
+        unique_texts, inverse = deduplicate_texts(texts, self.near_duplicates)
+        probabilities, stages = self._predict_unique(unique_texts)
+        return probabilities[inverse], stages[inverse] if stages is not None else None
+
+    def _predict_unique(self, texts):
+        """Score normalized texts, going through the prediction cache when one is set"""
+        if self.cache is None:
+            return self._score_texts(texts)
+        
+        if self._fingerprint is None:
+            self._fingerprint = model_fingerprint(self.model_dir, self.weight_dtype, self._cascade_enabled())
+            if self._cascade_enabled():
+                # Cascade rows also carry the deciding stage and depend on the band
+                low, high = self.cascade_band
+                self._fingerprint += f":cascade:{low}:{high}"
+        keys = [self.cache.make_key(text, self._fingerprint) for text in texts]
+        cached = self.cache.get_many(keys)
+        
+        # Score every distinct missing text in a single batch
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        if missing:
+            probabilities, stages = self._score_texts(list(missing.values()))
+            if stages is not None:
+                probabilities = np.column_stack([probabilities, stages])
+            new_rows = list(zip(missing.keys(), probabilities))
+            self.cache.put_many(new_rows)
+            cached.update(new_rows)
+        
+        rows = np.vstack([cached[key] for key in keys])
+        if self._cascade_enabled():
+            return rows[:, :-1], rows[:, -1].astype(np.int8)
+        return rows, None
+
+    def _cascade_enabled(self):
+        """True when a cascade band is configured and the linear model is available"""
+        return self.cascade_band is not None and self.cascade_model is not None
+
+    def _score_texts(self, texts):
+        """
+        Vectorize and score texts with the loaded model(s).
+
+        In cascade mode every text is scored by the linear model first and only
+        texts whose positive probability falls inside cascade_band go on to the deployed model.
+
+        Returns:
+            tuple: (class probability matrix, stage index per text into
+                    CASCADE_STAGES, or None when the cascade is disabled)
+        """
+        if self.engine is not None:
+            X_tfidf = self.engine.transform(texts)
+            score_mlp = self.engine.predict_proba_features
+        else:
+            X_tfidf = self.vectorizer.transform(texts)
+            score_mlp = self.model.predict_proba
+        
+        if not self._cascade_enabled():
+            return score_mlp(X_tfidf), None
+        
+        # Align the linear model's columns with the MLP's class order
+        linear_classes = [str(c) for c in self.cascade_model.classes_]
+        mlp_classes = self.engine.classes_ if self.engine is not None else self.model.classes_
+        order = [linear_classes.index(str(c)) for c in mlp_classes]
+        probabilities = np.asarray(self.cascade_model.predict_proba(X_tfidf), dtype=np.float64)[:, order]
+        
+        low, high = self.cascade_band
+        positive_probability = probabilities[:, self._positive_class_index()]
+        uncertain = (positive_probability >= low) & (positive_probability <= high)
+        if uncertain.any():
+            probabilities[uncertain] = score_mlp(X_tfidf[uncertain])
+        return probabilities, uncertain.astype(np.int8)
+
+    def _positive_class_index(self):
+        """Column of predict_proba that holds the positive class"""
+        source = self.engine if self.engine is not None else self.model
+        classes = list(getattr(source, 'classes_', [0, 1]))
+        for i, label in enumerate(classes):
+            # The model may have been trained on 'Positive'/'Negative' or on 0/1
+            if str(label).lower() == 'positive' or (not isinstance(label, str) and label == 1):
+                return i
+        return len(classes) - 1
+
+    def _decode_probabilities(self, probabilities):
+        """
+        Derive labels and confidences from a predict_proba matrix.
+
+        Returns:
+            tuple: (boolean array, True where the review is positive,
+                    float array with the probability of the predicted class)
+        """
+        probabilities = np.asarray(probabilities)
+        predicted = probabilities.argmax(axis=1)
+        is_positive = predicted == self._positive_class_index()
+        confidences = probabilities[np.arange(len(predicted)), predicted]
+        return is_positive, confidences
+
+    def _build_results(self, reviews, is_positive, confidences, include_details=True, stages=None, top_k=None,
+                       columnar=False):
+        """Aggregate per-review labels and confidences into the results dict"""
+        model_name = f'Cascade (LR + {self.model_name})' if stages is not None else self.model_name
+        results = SentimentTotals().add(is_positive, confidences).to_summary(model_name)
+        if stages is not None:
+            mlp_count = int(np.count_nonzero(stages))
+            results['cascade_stage_counts'] = {'linear': len(stages) - mlp_count, 'mlp': mlp_count}
+        
+        strengths = strength_codes(confidences)
         
         detailed_results = []
-        positive_count = 0
-        negative_count = 0
+        if top_k is not None:
+            results['top_reviews'] = self._top_reviews(reviews, is_positive, confidences, strengths, top_k, stages)
+        elif include_details:
+            # Most confident first; a stable sort keeps input order among ties
+            detailed_results = AnalysisResult.from_arrays(reviews, is_positive, confidences, strengths, stages)
+            if not columnar:
+                detailed_results = detailed_results.to_records()
         
-        for review in reviews:
-            text = review.get('body', '').lower()
-            pos_matches = sum(1 for word in positive_words if re.search(r'\b' + word + r'\b', text))
-            neg_matches = sum(1 for word in negative_words if re.search(r'\b' + word + r'\b', text))
-            
-            sentiment = 'positive' if pos_matches > neg_matches else 'negative'
-            confidence = 0.5 + (abs(pos_matches - neg_matches) / 10)
-            confidence = min(confidence, 0.9)  # Cap at 0.9 for fallback mode
-            
-            if sentiment == 'positive':
-                positive_count += 1
-            else:
-                negative_count += 1
-                
-            detailed_results.append({
-                'review': review.get('body', ''),
-                'sentiment': sentiment,
-                'confidence': float(confidence),
-                'sentiment_strength': 'moderate',
-                'rating': review.get('rating', None),
-                'helpful_votes': review.get('helpful_votes', 0)
-            })
+        results['detailed_results'] = detailed_results
+        return results
+
+    @staticmethod
+    def _top_k_indices(confidences, candidates, k, most_confident=True):
+        """Indices of the k most (or least) confident candidates, best first, via argpartition"""
+        keys = -confidences[candidates] if most_confident else confidences[candidates]
+        if len(candidates) > k:
+            selected = np.argpartition(keys, k - 1)[:k]
+            candidates, keys = candidates[selected], keys[selected]
+        return candidates[np.argsort(keys, kind='stable')]
+
+    def _top_reviews(self, reviews, is_positive, confidences, strengths, top_k, stages=None):
+        """
+        Build dicts only for the top-k most and least confident reviews per sentiment.
+
+        Returns:
+            dict: {'positive': {'most_confident': [...], 'least_confident': [...]},
+                   'negative': {...}}
+        """
+        top_reviews = {}
+        for sentiment, mask in (('positive', is_positive), ('negative', ~is_positive)):
+            candidates = np.flatnonzero(mask)
+            top_reviews[sentiment] = {
+                name: [_review_record(reviews[i], is_positive[i], confidences[i], AnalysisResult.STRENGTHS[strengths[i]],
+                                      CASCADE_STAGES[stages[i]] if stages is not None else None)
+                       for i in self._top_k_indices(confidences, candidates, top_k, most_confident)]
+                for name, most_confident in (('most_confident', True), ('least_confident', False))
+            }
+        return top_reviews
+
+    def analyze_reviews_stream(self, reviews, chunk_size=1000, include_details=False):
+        """
+        Analyze an arbitrarily large iterable of reviews in fixed-size chunks.
+
+        Only one chunk is vectorized and scored at a time, so memory stays
+        constant regardless of how many reviews the iterable produces.
+
+        Args:
+            reviews (iterable): Review dicts, e.g. from iter_reviews_from_csv()
+            chunk_size (int): Number of reviews vectorized and scored per chunk
+            include_details (bool): Include per-review results for each chunk
+
+        Yields:
+            dict: {'chunk_index': int,
+                   'chunk': analyze_reviews() results for the chunk,
+                   'summary': running summary over every chunk so far}
+            The 'summary' of the last chunk is the final summary, in the same
+            format analyze_reviews returns (with an empty 'detailed_results').
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        
+        totals = SentimentTotals()
+        iterator = iter(reviews)
+        chunk_index = 0
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            chunk_results = self.analyze_reviews(chunk, include_details=include_details)
+            totals.add_results(chunk_results)
+            yield {
+                'chunk_index': chunk_index,
+                'chunk': chunk_results,
+                'summary': totals.to_summary(chunk_results['model_name'])
+            }
+            chunk_index += 1
             
-        total = positive_count + negative_count
-        score = positive_count / total if total > 0 else 0.5
-        overall_sentiment = 'positive' if score >= 0.5 else 'negative'
+    def _fallback_analysis(self, reviews, top_k=None, columnar=False):
+        """Simple fallback sentiment analysis when model loading fails"""
+        lexicon = load_lexicon(self.lexicon_path) if self.lexicon_path else DEFAULT_LEXICON
+        lexicon_words = lexicon.keys()
         
-        return {
-            'overall_sentiment': overall_sentiment,
-            'score': score,
-            'positive_count': positive_count,
-            'negative_count': negative_count,
-            'detailed_results': detailed_results,
-            'model_name': 'Fallback Model'
-        }
+        # Weighted score per review from the distinct lexicon words it contains
+        texts = [normalize_review_text(review.get('body', '')) for review in reviews]
+        scores = np.fromiter(
+            (sum(lexicon[word] for word in lexicon_words & set(_WORD_RE.findall(text.lower()))) for text in texts),
+            dtype=np.float64, count=len(texts)
+        )
+        is_positive = scores > 0
+        confidences = np.minimum(0.5 + np.abs(scores) / 10, 0.9)  # Cap at 0.9 for fallback mode
+        strengths = np.ones(len(reviews), dtype=np.int8)  # Always 'moderate' in fallback mode
+        
+        results = SentimentTotals().add(is_positive, confidences).to_summary('Fallback Model')
+        if top_k is not None:
+            results['top_reviews'] = self._top_reviews(reviews, is_positive, confidences, strengths, top_k)
+            results['detailed_results'] = []
+        else:
+            # Fallback results keep the input order
+            detailed_results = AnalysisResult.from_arrays(reviews, is_positive, confidences, strengths, sort=False)
+            results['detailed_results'] = detailed_results if columnar else detailed_results.to_records()
+        return results
         
     def create_visualizations(self, analysis_results):
         """
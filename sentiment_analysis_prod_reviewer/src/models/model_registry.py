@@ -0,0 +1,163 @@
+"""
+Model Registry
+
+Process-wide cache for the sentiment model artifacts. Each artifact set is
+loaded once per process and the same read-only objects are shared by every
+SentimentAnalyzer instance, Streamlit session and thread.
+"""
+
+import json
+import os
+import threading
+from collections import namedtuple
+
+import joblib
+
+from src.models.fast_engine import ENGINE_DIRNAME, ENGINE_FILENAME, FastSentimentEngine
+
+# Directory containing sentiment_model.pkl, vectorizer.pkl, label_encoder.pkl and model_metadata.json
+DEFAULT_MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Linear first-stage model used by the confidence-gated cascade
+CASCADE_MODEL_FILENAME = 'cascade_model.pkl'
+
+# Written next to the artifacts by save_model_for_integration(), names the deployed model
+MODEL_METADATA_FILENAME = 'model_metadata.json'
+# Name reported for artifacts saved before the metadata file existed
+DEFAULT_MODEL_NAME = 'MLP (Imbalanced)'
+
+ModelArtifacts = namedtuple('ModelArtifacts', ['model', 'vectorizer', 'label_encoder', 'engine', 'error', 'model_name'])
+
+
+def read_model_name(model_dir=DEFAULT_MODEL_DIR):
+    """Display name of the model saved in model_dir, from its metadata file"""
+    try:
+        with open(os.path.join(model_dir, MODEL_METADATA_FILENAME)) as f:
+            return json.load(f).get('model_name') or DEFAULT_MODEL_NAME
+    except (OSError, ValueError):
+        return DEFAULT_MODEL_NAME
+
+
+class ModelRegistry:
+    """Thread-safe, lazily populated cache of loaded model artifacts"""
+
+    def __init__(self):
+        self._artifacts = {}
+        self._cascade_models = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_dir=DEFAULT_MODEL_DIR, weight_dtype=None):
+        """
+        Return the artifacts stored in model_dir, loading them on first use.
+
+        Args:
+            model_dir (str): Directory containing the pickled model files
+            weight_dtype (str): Load the reduced precision engine exported as
+                sentiment_engine_<weight_dtype> instead of the default artifacts
+
+        Returns:
+            ModelArtifacts: Shared artifacts. When an exported fast engine is
+            present only the engine is loaded and the sklearn objects are None.
+            If loading failed, every artifact is None and error holds the exception;
+            failed loads are not cached, so the next call tries again (e.g. once
+            the model has been trained or copied into place).
+        """
+        key = (os.path.abspath(model_dir), weight_dtype)
+        artifacts = self._artifacts.get(key)
+        if artifacts is not None:
+            return artifacts
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            artifacts = self._artifacts.get(key)
+            if artifacts is None:
+                artifacts = self._load(*key)
+                if artifacts.error is None:
+                    self._artifacts[key] = artifacts
+        return artifacts
+
+    def _load(self, model_dir, weight_dtype=None):
+        """Load the artifacts from disk"""
+        model_name = read_model_name(model_dir)
+        if weight_dtype is not None:
+            engine_path = os.path.join(model_dir, f'{ENGINE_DIRNAME}_{weight_dtype}')
+            try:
+                print(f"Loading {weight_dtype} sentiment engine...")
+                engine = FastSentimentEngine.load(engine_path, mmap_mode='r')
+                return ModelArtifacts(None, None, None, engine, None, model_name)
+            except Exception as e:
+                print(f"Error loading {weight_dtype} engine: {e}")
+                print("Falling back to the full precision model...")
+
+        # Prefer the memory-mapped array directory: processes on one host share
+        # its pages and opening it costs milliseconds. The exported engine needs
+        # neither scikit-learn nor the pickles.
+        for engine_name, mmap_mode in ((ENGINE_DIRNAME, 'r'), (ENGINE_FILENAME, None)):
+            engine_path = os.path.join(model_dir, engine_name)
+            if not os.path.exists(engine_path):
+                continue
+            try:
+                print(f"Loading fast sentiment engine from '{engine_name}'...")
+                engine = FastSentimentEngine.load(engine_path, mmap_mode=mmap_mode)
+                print(f"{model_name} engine loaded successfully!")
+                return ModelArtifacts(None, None, None, engine, None, model_name)
+            except Exception as e:
+                print(f"Error loading fast engine: {e}")
+
+        try:
+            print("Loading sentiment analysis model...")
+            model = joblib.load(os.path.join(model_dir, 'sentiment_model.pkl'))
+            vectorizer = joblib.load(os.path.join(model_dir, 'vectorizer.pkl'))
+            label_encoder = joblib.load(os.path.join(model_dir, 'label_encoder.pkl'))
+            print(f"{model_name} model loaded successfully!")
+            return ModelArtifacts(model, vectorizer, label_encoder, None, None, model_name)
+        except Exception as e:
+            print(f"Error loading model: {e}")
+            return ModelArtifacts(None, None, None, None, e, None)
+
+    def get_cascade_model(self, model_dir=DEFAULT_MODEL_DIR):
+        """
+        Return the linear first-stage model saved as cascade_model.pkl, loading it on first use.
+
+        Returns:
+            The fitted model, or None if it is missing or failed to load
+        """
+        model_dir = os.path.abspath(model_dir)
+        if model_dir in self._cascade_models:
+            return self._cascade_models[model_dir]
+
+        with self._lock:
+            if model_dir not in self._cascade_models:
+                model = None
+                try:
+                    print("Loading cascade (linear) model...")
+                    model = joblib.load(os.path.join(model_dir, CASCADE_MODEL_FILENAME))
+                except Exception as e:
+                    print(f"Error loading cascade model: {e}")
+                    print("Cascade disabled, scoring every review with the deployed model...")
+                self._cascade_models[model_dir] = model
+        return self._cascade_models[model_dir]
+
+    def is_loaded(self, model_dir=DEFAULT_MODEL_DIR, weight_dtype=None):
+        """Check whether the artifacts in model_dir have already been loaded"""
+        return (os.path.abspath(model_dir), weight_dtype) in self._artifacts
+
+    def clear(self):
+        """Drop all cached artifacts so the next get() reloads them from disk"""
+        with self._lock:
+            self._artifacts.clear()
+            self._cascade_models.clear()
+
+
+# Shared registry used by the whole process
+registry = ModelRegistry()
+
+
+def get_model_artifacts(model_dir=DEFAULT_MODEL_DIR, weight_dtype=None):
+    """Return the shared artifacts for model_dir from the process-wide registry"""
+    return registry.get(model_dir, weight_dtype)
+
+
+def get_cascade_model(model_dir=DEFAULT_MODEL_DIR):
+    """Return the shared cascade model for model_dir from the process-wide registry"""
+    return registry.get_cascade_model(model_dir)
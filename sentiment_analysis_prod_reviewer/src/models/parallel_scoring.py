@@ -0,0 +1,80 @@
+"""
+Parallel Sentiment Scoring
+
+Multi-process scoring for offline backfills over large review dumps.
+Workers share the model artifacts with the parent process instead of
+receiving them with every task: on platforms that support fork they inherit
+the already loaded artifacts copy-on-write, elsewhere each worker loads them
+once through the model registry when it starts.
+"""
+
+import os
+from itertools import islice
+
+from src.models.model_integration import SentimentAnalyzer, SentimentTotals
+from src.models.model_registry import DEFAULT_MODEL_DIR, read_model_name
+from src.models.worker_pool import create_pool
+
+# Analyzer used inside worker processes (inherited through fork or set by _init_worker)
+_worker_analyzer = None
+
+
+def _init_worker(model_dir):
+    """Pool initializer: make sure the worker has a loaded analyzer"""
+    global _worker_analyzer
+    if _worker_analyzer is None or _worker_analyzer.model_dir != model_dir:
+        _worker_analyzer = SentimentAnalyzer(model_dir)
+        _worker_analyzer._ensure_loaded()
+
+
+def _score_shard(texts):
+    """Score one shard of review texts and return its aggregate counts"""
+    results = _worker_analyzer.analyze_reviews([{'body': text} for text in texts], include_details=False)
+    totals = SentimentTotals().add_results(results)
+    return totals.positive_count, totals.negative_count, totals.confidence_sum, results['model_name']
+
+
+class ParallelSentimentScorer:
+    """Score huge review collections across all cores and merge the aggregates"""
+
+    def __init__(self, model_dir=DEFAULT_MODEL_DIR, n_workers=None, shard_size=5000):
+        """
+        Args:
+            model_dir (str): Directory containing the saved model files
+            n_workers (int): Number of worker processes (defaults to all cores)
+            shard_size (int): Number of reviews sent to a worker per task
+        """
+        if shard_size < 1:
+            raise ValueError("shard_size must be at least 1")
+        self.model_dir = model_dir
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+
+    def _shards(self, reviews):
+        """Split reviews (dicts or plain strings) into lists of texts"""
+        iterator = iter(reviews)
+        while True:
+            chunk = list(islice(iterator, self.shard_size))
+            if not chunk:
+                return
+            yield [review.get('body', '') if isinstance(review, dict) else str(review) for review in chunk]
+
+    def score(self, reviews):
+        """
+        Score an iterable of reviews in parallel.
+
+        Args:
+            reviews (iterable): Review dicts with a 'body' key, or plain strings
+
+        Returns:
+            dict: Summary in the same format analyze_reviews returns
+                  (with an empty 'detailed_results')
+        """
+        totals = SentimentTotals()
+        model_name = read_model_name(self.model_dir)
+        # Under fork the parent loads the artifacts once and the workers inherit them
+        with create_pool(self.n_workers, initializer=_init_worker, initargs=(self.model_dir,),
+                         prepare_parent=lambda: _init_worker(self.model_dir)) as pool:
+            for positive, negative, confidence_sum, model_name in pool.imap_unordered(_score_shard, self._shards(reviews)):
+                totals.merge(SentimentTotals(positive, negative, confidence_sum))
+        return totals.to_summary(model_name)
@@ -0,0 +1,159 @@
+"""
+Review Corpus Loader
+
+Streaming loader for the Amazon Fine Food Reviews.csv training corpus. Only
+the Text and Score columns are read, with explicit dtypes, in chunks, and a
+uniform random sample is drawn while streaming (reservoir sampling with
+random priority keys). Peak memory is proportional to the sample plus one
+chunk instead of the whole file. The corpus can be converted once to a
+Parquet file holding just those two columns, which later runs read instead
+of the CSV.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Columns needed for training and how to parse them
+REVIEW_COLUMNS = ['Text', 'Score']
+REVIEW_DTYPES = {'Text': 'object', 'Score': 'int8'}
+
+DEFAULT_CHUNKSIZE = 100000
+
+
+def parquet_path_for(csv_path):
+    """Location of the Parquet copy of a CSV corpus (next to it, same name)"""
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+
+def iter_review_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yield DataFrames with the Text and Score columns of a corpus, chunk by chunk.
+
+    Args:
+        path (str): Reviews.csv, or a .parquet file written by convert_to_parquet()
+        chunksize (int): Rows per chunk
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+
+    offset = 0
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        chunks = (batch.to_pandas() for batch in
+                  pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=REVIEW_COLUMNS))
+    else:
+        chunks = pd.read_csv(path, usecols=REVIEW_COLUMNS, dtype=REVIEW_DTYPES, chunksize=chunksize)
+    for chunk in chunks:
+        # Row numbers of the original file, whatever the source format
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        # read_csv keeps the file's column order; fix it to REVIEW_COLUMNS
+        yield chunk[REVIEW_COLUMNS].astype(REVIEW_DTYPES)
+
+
+def convert_to_parquet(csv_path, parquet_path=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Write the Text and Score columns of a CSV corpus to Parquet, chunk by chunk.
+
+    Requires pyarrow.
+
+    Returns:
+        str: Path of the Parquet file
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Converting the corpus to Parquet requires pyarrow (pip install pyarrow)") from e
+
+    parquet_path = parquet_path or parquet_path_for(csv_path)
+    tmp_path = f"{parquet_path}.tmp"
+    writer = None
+    try:
+        for chunk in iter_review_chunks(csv_path, chunksize):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, parquet_path)
+    print(f"Converted '{csv_path}' to '{parquet_path}'")
+    return parquet_path
+
+
+def reservoir_sample(chunks, sample_size, random_state=42):
+    """
+    Draw a uniform random sample of rows from a stream of DataFrames.
+
+    Every row gets a random key and the sample_size rows with the smallest
+    keys are kept, so at most one chunk plus the sample is held in memory.
+    The result does not depend on the chunk size.
+
+    Args:
+        chunks (iterable): DataFrames with the same columns
+        sample_size (int): Number of rows to keep
+        random_state (int): Seed of the random keys
+
+    Returns:
+        tuple: (sampled DataFrame in random order, total number of rows seen,
+                Score value counts over all rows)
+    """
+    rng = np.random.default_rng(random_state)
+    sample = None
+    keys = np.empty(0)
+    total_rows = 0
+    score_counts = pd.Series(dtype='int64')
+    for chunk in chunks:
+        chunk_keys = rng.random(len(chunk))
+        total_rows += len(chunk)
+        score_counts = score_counts.add(chunk['Score'].value_counts(), fill_value=0)
+
+        if sample is not None and len(sample) >= sample_size:
+            # Only rows that beat the current largest key can enter the sample
+            candidates = chunk_keys < keys.max()
+            chunk, chunk_keys = chunk[candidates], chunk_keys[candidates]
+        sample = chunk if sample is None else pd.concat([sample, chunk])
+        keys = np.concatenate([keys, chunk_keys])
+        if len(sample) > sample_size:
+            keep = np.argpartition(keys, sample_size - 1)[:sample_size]
+            sample, keys = sample.iloc[keep], keys[keep]
+
+    if sample is None:
+        return pd.DataFrame(columns=REVIEW_COLUMNS), 0, score_counts.astype('int64')
+    order = np.argsort(keys, kind='stable')
+    return sample.iloc[order].copy(), total_rows, score_counts.astype('int64').sort_values(ascending=False)
+
+
+def load_review_sample(csv_path, sample_size=50000, random_state=42, chunksize=DEFAULT_CHUNKSIZE,
+                       convert=False):
+    """
+    Stream a corpus and return a uniform random sample of its Text/Score rows.
+
+    The Parquet copy next to the CSV is used when it exists and is not older
+    than the CSV.
+
+    Args:
+        csv_path (str): Path of Reviews.csv
+        sample_size (int): Number of rows to sample
+        random_state (int): Seed of the sample
+        chunksize (int): Rows read at a time
+        convert (bool): Write the Parquet copy first if it is missing or stale
+
+    Returns:
+        tuple: see reservoir_sample()
+    """
+    parquet_path = parquet_path_for(csv_path)
+    use_parquet = (os.path.exists(parquet_path) and
+                   (not os.path.exists(csv_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)))
+    if convert and not use_parquet:
+        use_parquet = bool(convert_to_parquet(csv_path, parquet_path, chunksize))
+    path = parquet_path if use_parquet else csv_path
+    print(f"Streaming review corpus from '{path}'...")
+    return reservoir_sample(iter_review_chunks(path, chunksize), sample_size, random_state)
@@ -0,0 +1,121 @@
+"""
+Review Text Preprocessing
+
+Normalization and deduplication applied before vectorization, both when
+training (load_and_preprocess_data) and when scoring (SentimentAnalyzer).
+Known Amazon page boilerplate such as the "Click to play video" prefix is
+stripped, exact duplicates are collapsed on a case/whitespace-insensitive key
+and near-duplicates are grouped with 64-bit SimHash fingerprints, so only one
+representative per group has to be vectorized and scored.
+"""
+
+import hashlib
+import html
+import re
+
+import numpy as np
+
+# Page furniture that ends up in scraped or exported review bodies
+BOILERPLATE_PATTERNS = [
+    re.compile(r'^\s*Click to play video\s*', re.IGNORECASE),
+    re.compile(r'^\s*The media could not be loaded\.\s*', re.IGNORECASE),
+    re.compile(r'\s*Read more\s*$', re.IGNORECASE),
+]
+_HTML_BREAK_RE = re.compile(r'<br\s*/?>', re.IGNORECASE)
+_SHINGLE_WORD_RE = re.compile(r'\w+')
+
+SIMHASH_BITS = 64
+# Near-duplicates differ in at most this many fingerprint bits. Splitting the
+# fingerprint into MAX_DISTANCE + 1 bands guarantees such a pair shares a band.
+SIMHASH_MAX_DISTANCE = 3
+_BAND_BITS = SIMHASH_BITS // (SIMHASH_MAX_DISTANCE + 1)
+# Shorter texts are only deduplicated exactly; their fingerprints are too noisy
+SIMHASH_MIN_TOKENS = 8
+
+_BIT_SHIFTS = np.arange(SIMHASH_BITS, dtype=np.uint64)
+
+
+def normalize_review_text(text):
+    """Strip boilerplate and HTML line breaks and collapse whitespace"""
+    if not isinstance(text, str):
+        text = '' if text is None or text != text else str(text)  # None/NaN become empty
+    text = html.unescape(_HTML_BREAK_RE.sub(' ', text))
+    for pattern in BOILERPLATE_PATTERNS:
+        text = pattern.sub('', text)
+    return ' '.join(text.split())
+
+
+def simhash(text):
+    """
+    64-bit SimHash of a text over its word bigrams.
+
+    Returns:
+        int: Fingerprint, or None if the text has fewer than SIMHASH_MIN_TOKENS words
+    """
+    words = _SHINGLE_WORD_RE.findall(text.lower())
+    if len(words) < SIMHASH_MIN_TOKENS:
+        return None
+    shingles = {f'{a} {b}' for a, b in zip(words, words[1:])}
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little') for s in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+    # Each bit votes +1/-1 per shingle; the fingerprint keeps the majority
+    ones = ((hashes[:, None] >> _BIT_SHIFTS) & np.uint64(1)).sum(axis=0)
+    bits = (2 * ones > len(hashes)).astype(np.uint64)
+    return int((bits << _BIT_SHIFTS).sum())
+
+
+def deduplicate_texts(texts, near_duplicates=True):
+    """
+    Normalize texts and collapse exact and near-duplicate ones.
+
+    Args:
+        texts (list): Raw review texts
+        near_duplicates (bool): Also group texts whose SimHash fingerprints
+            differ in at most SIMHASH_MAX_DISTANCE bits
+
+    Returns:
+        tuple: (list of normalized representative texts, int array mapping each
+                input text to its representative, like np.unique's inverse)
+    """
+    unique_texts = []
+    inverse = np.empty(len(texts), dtype=np.int64)
+    exact = {}
+    bands = {}
+    fingerprints = []
+    for i, text in enumerate(texts):
+        text = normalize_review_text(text)
+        # Case and whitespace do not change the TF-IDF features
+        key = text.lower()
+        index = exact.get(key)
+        if index is None and near_duplicates:
+            index, fingerprint = _near_duplicate(text, bands, fingerprints)
+        if index is None:
+            index = len(unique_texts)
+            unique_texts.append(text)
+            if near_duplicates:
+                fingerprints.append(fingerprint)
+                if fingerprint is not None:
+                    for band in _bands(fingerprint):
+                        bands.setdefault(band, []).append(index)
+        exact.setdefault(key, index)
+        inverse[i] = index
+    return unique_texts, inverse
+
+
+def _bands(fingerprint):
+    mask = (1 << _BAND_BITS) - 1
+    return [(b, (fingerprint >> (b * _BAND_BITS)) & mask) for b in range(SIMHASH_MAX_DISTANCE + 1)]
+
+
+def _near_duplicate(text, bands, fingerprints):
+    """Return (index of a near-duplicate representative or None, the text's fingerprint)"""
+    fingerprint = simhash(text)
+    if fingerprint is None:
+        return None, None
+    for band in _bands(fingerprint):
+        for index in bands.get(band, ()):
+            if bin(fingerprint ^ fingerprints[index]).count('1') <= SIMHASH_MAX_DISTANCE:
+                return index, fingerprint
+    return None, fingerprint
@@ -0,0 +1,82 @@
+"""
+Worker Pools
+
+Process pool setup shared by parallel scoring, parallel training and the
+hyperparameter search. Fork is preferred so workers inherit state the
+parent has already loaded copy-on-write; under spawn the pool initializer
+loads it once per worker instead.
+
+Every worker also gets its share of the cores for BLAS/OpenMP threads and
+estimator n_jobs. Without the cap each of the n workers would start one
+native thread per core and the machine would run n x cores threads.
+"""
+
+import multiprocessing
+import os
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # threadpoolctl ships with scikit-learn, but is not required here
+    threadpool_limits = None
+
+# Read by the BLAS/OpenMP runtimes when they are first loaded
+THREAD_LIMIT_VARIABLES = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                          'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+# Thread cap of the current process when it is a pool worker
+_worker_threads = None
+
+
+def limit_worker_threads(n_threads=1):
+    """
+    Cap the native thread pools of the current process.
+
+    The environment variables cover runtimes loaded after this call;
+    threadpoolctl also resizes the ones that are already loaded.
+    """
+    global _worker_threads
+    _worker_threads = n_threads
+    for name in THREAD_LIMIT_VARIABLES:
+        os.environ[name] = str(n_threads)
+    if threadpool_limits is not None:
+        threadpool_limits(limits=n_threads)
+
+
+def worker_n_jobs(default=-1):
+    """n_jobs for estimators: the thread cap inside pool workers, default elsewhere"""
+    return _worker_threads or default
+
+
+def _init_pool_worker(initializer, initargs, n_threads):
+    """Pool initializer: limit the worker's threads, then run the caller's initializer"""
+    limit_worker_threads(n_threads)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def create_pool(n_workers, initializer=None, initargs=(), prepare_parent=None, threads_per_worker=None):
+    """
+    Start a process pool, preferring fork.
+
+    Args:
+        n_workers (int): Number of worker processes
+        initializer (callable): Module-level function run once in every worker
+        initargs (tuple): Arguments for initializer
+        prepare_parent (callable): Run in the parent before forking, so the workers
+            inherit what it loads. Skipped under spawn, where initializer loads it.
+        threads_per_worker (int): BLAS/OpenMP threads and n_jobs allowed per worker
+            (defaults to the cores divided evenly between the workers)
+
+    Returns:
+        multiprocessing.pool.Pool
+    """
+    if threads_per_worker is None:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // n_workers)
+    if 'fork' in multiprocessing.get_all_start_methods():
+        if prepare_parent is not None:
+            prepare_parent()
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context('spawn')
+    return context.Pool(n_workers, initializer=_init_pool_worker,
+                        initargs=(initializer, initargs, threads_per_worker))
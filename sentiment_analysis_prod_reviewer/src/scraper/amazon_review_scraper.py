@@ -649,6 +649,9 @@ class AmazonReviewScraper:
                     try:
                         review_data = {}
                         
+                        # Amazon's review ID identifies the review in the aggregate store
+                        review_data["review_id"] = review_element.get_attribute("id") or ""
+                        
                         # Add product title to the review data
                         review_data["product_title"] = product_title
                         
@@ -539,6 +539,7 @@ class InteractiveReviewScraper:
                         
                         # Get helpful votes
                         review_data = {
+                            "review_id": review_id,
                             "product_title": product_title,
                             "rating": rating,
                             "title": title,
@@ -408,8 +408,10 @@ class AmazonReviewScraper(ReviewScraper):
                             if body_elem:
                                 body = body_elem.text.strip()
                         
-                        # Create review data dictionary with only the needed fields
+                        # Create review data dictionary with only the needed fields (the ID
+                        # identifies the review in the aggregate store)
                         review_data = {
+                            "review_id": review_id,
                             "product_title": product_title,
                             "rating": rating,
                             "title": title,
@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.aggregate_store import ProductSentimentStore
+from src.models.model_integration import SentimentAnalyzer
+
+
+def test_aggregate_store_folds_only_new_reviews():
+    print("Testing incremental product aggregates...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # An empty model directory makes the analyzer use the deterministic fallback lexicon
+        analyzer = SentimentAnalyzer(model_dir=tmp_dir)
+        store = ProductSentimentStore(os.path.join(tmp_dir, 'aggregates.sqlite'))
+
+        first_batch = [
+            {'body': 'Great product, I love it'},
+            {'body': 'Terrible and broken on arrival'},
+        ]
+        summary = store.update('B000TEST', first_batch, analyzer)
+        assert summary['positive_count'] == 1
+        assert summary['negative_count'] == 1
+
+        # Re-scraped reviews are skipped, only the new one is folded in
+        second_batch = first_batch + [{'body': 'Excellent, the best purchase this year'}]
+        summary = store.update('B000TEST', second_batch, analyzer)
+        assert summary['review_count'] == 3
+        assert summary['positive_count'] == 2
+        assert sum(summary['confidence_histogram']) == 3
+        assert store.summary('B000TEST') == summary
+
+        store.close()
+
+    print("Aggregates fold in only new reviews")
+
+
+def test_aggregate_store_counts_duplicate_bodies():
+    print("Testing aggregates of reviews with the same text...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        analyzer = SentimentAnalyzer(model_dir=tmp_dir)
+        store = ProductSentimentStore(os.path.join(tmp_dir, 'aggregates.sqlite'))
+
+        # Distinct customers writing the same short text are separate reviews
+        reviews = [{'body': 'Great product'} for _ in range(5)] + [{'body': 'Terrible'}]
+        summary = store.update('B000TEST', reviews, analyzer)
+        expected = analyzer.analyze_reviews(reviews, include_details=False)
+        assert summary['review_count'] == 6
+        assert summary['positive_count'] == expected['positive_count'] == 5
+        assert summary['negative_count'] == expected['negative_count'] == 1
+        assert abs(summary['score'] - expected['score']) < 1e-9
+
+        # Scraping the same page again adds nothing, one more identical review is counted
+        summary = store.update('B000TEST', reviews + [{'body': 'Great product'}], analyzer)
+        assert summary['review_count'] == 7 and summary['positive_count'] == 6
+
+        # Reviews with an ID are identified by it alone
+        summary = store.update('B000TEST', [{'review_id': 'R1', 'body': 'Great product'},
+                                            {'review_id': 'R1', 'body': 'Great product, edited'}], analyzer)
+        assert summary['review_count'] == 8
+
+        store.close()
+
+    print("Aggregates count every review, including duplicate texts")
+
+
+if __name__ == "__main__":
+    test_aggregate_store_folds_only_new_reviews()
+    test_aggregate_store_counts_duplicate_bodies()
@@ -0,0 +1,76 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.model_integration import AnalysisResult, SentimentAnalyzer, strength_codes
+
+
+def test_columnar_results_match_records():
+    print("Testing columnar analysis results...")
+
+    reviews = [{'body': 'Terrible', 'rating': 1}, {'body': 'Great', 'rating': 5}, {'body': 'Fine', 'rating': 3}]
+    confidences = np.array([0.95, 0.7, 0.55])
+    result = AnalysisResult.from_arrays(reviews, np.array([False, True, True]), confidences,
+                                        strength_codes(confidences))
+
+    assert len(result) == 3
+    assert result[0]['review'] == 'Terrible' and result[0]['sentiment_strength'] == 'strong'
+    assert [r['sentiment_strength'] for r in result] == ['strong', 'moderate', 'weak']
+    assert result.to_records() == list(result)
+    assert list(result.to_frame()['sentiment']) == ['negative', 'positive', 'positive']
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # The fallback analyzer produces the same rows in both layouts
+        analyzer = SentimentAnalyzer(model_dir=tmp_dir)
+        records = analyzer.analyze_reviews(reviews)['detailed_results']
+        columnar = analyzer.analyze_reviews(reviews, columnar=True)['detailed_results']
+        assert isinstance(columnar, AnalysisResult)
+        assert columnar.to_records() == records
+
+    print("Columnar results match the record layout")
+
+
+def test_top_k_matches_full_sort():
+    print("Testing top-k review selection...")
+
+    # Distinct confidences: the partial selection must equal a full sort
+    rng = np.random.default_rng(0)
+    confidences = rng.permutation(np.linspace(0.5, 1.0, 200))
+    candidates = np.flatnonzero(rng.random(200) < 0.6)
+    by_confidence = candidates[np.argsort(-confidences[candidates], kind='stable')]
+    for k in (1, 5, len(candidates), len(candidates) + 10):
+        most = SentimentAnalyzer._top_k_indices(confidences, candidates, k, most_confident=True)
+        least = SentimentAnalyzer._top_k_indices(confidences, candidates, k, most_confident=False)
+        assert list(most) == list(by_confidence[:k])
+        assert list(least) == list(by_confidence[::-1][:k])
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        analyzer = SentimentAnalyzer(model_dir=tmp_dir)
+        reviews = [{'body': body} for body in [
+            'great', 'great and excellent', 'great excellent amazing love', 'terrible', 'terrible awful',
+            'terrible awful worst hate broken', 'good', 'bad', 'best perfect awesome'
+        ]]
+        records = analyzer.analyze_reviews(reviews)['detailed_results']
+        top_reviews = analyzer.analyze_reviews(reviews, top_k=2)['top_reviews']
+        for sentiment in ('positive', 'negative'):
+            ranked = sorted((r['confidence'] for r in records if r['sentiment'] == sentiment), reverse=True)
+            assert [r['confidence'] for r in top_reviews[sentiment]['most_confident']] == ranked[:2]
+            assert [r['confidence'] for r in top_reviews[sentiment]['least_confident']] == ranked[::-1][:2]
+
+        # An invalid top_k is rejected before anything is scored
+        try:
+            analyzer.analyze_reviews(reviews, top_k=0)
+            assert False, "top_k=0 should raise"
+        except ValueError:
+            pass
+
+    print("Top-k reviews match a full sort")
+
+
+if __name__ == "__main__":
+    test_columnar_results_match_records()
+    test_top_k_matches_full_sort()
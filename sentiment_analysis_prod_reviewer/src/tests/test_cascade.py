@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.model_integration import SentimentAnalyzer, model_fingerprint
+from src.models.model_registry import registry
+
+TRAINING_TEXTS = ['great product love it', 'excellent quality works great', 'good value', 'love this',
+                  'terrible broken waste', 'awful quality broke quickly', 'bad product', 'hate it']
+TRAINING_LABELS = ['Positive'] * 4 + ['Negative'] * 4
+REVIEWS = [{'body': body} for body in ['great product', 'love the quality', 'terrible and broken', 'bad value',
+                                       'works', 'it broke', 'excellent', 'quality product']]
+
+
+def test_cascade_gating_and_stage_counts():
+    print("Testing the confidence-gated cascade...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vectorizer = TfidfVectorizer()
+        X = vectorizer.fit_transform(TRAINING_TEXTS)
+        model = LogisticRegression(C=10.0).fit(X, TRAINING_LABELS)
+        linear = LogisticRegression(C=0.1).fit(X, TRAINING_LABELS)
+        joblib.dump(model, os.path.join(tmp_dir, 'sentiment_model.pkl'))
+        joblib.dump(vectorizer, os.path.join(tmp_dir, 'vectorizer.pkl'))
+        joblib.dump(LabelEncoder().fit(['Negative', 'Positive']), os.path.join(tmp_dir, 'label_encoder.pkl'))
+        joblib.dump(linear, os.path.join(tmp_dir, 'cascade_model.pkl'))
+
+        X_reviews = vectorizer.transform([review['body'] for review in REVIEWS])
+        linear_positive = linear.predict_proba(X_reviews)[:, list(linear.classes_).index('Positive')]
+        baseline = SentimentAnalyzer(model_dir=tmp_dir).analyze_reviews(REVIEWS, columnar=True)
+
+        # A band covering everything sends every review to the second stage
+        results = SentimentAnalyzer(model_dir=tmp_dir, cascade_band=(0.0, 1.0)).analyze_reviews(REVIEWS, columnar=True)
+        assert results['cascade_stage_counts'] == {'linear': 0, 'mlp': len(REVIEWS)}
+        assert np.allclose(results['detailed_results'].confidences, baseline['detailed_results'].confidences)
+
+        # An empty band lets the linear model decide every review
+        results = SentimentAnalyzer(model_dir=tmp_dir, cascade_band=(2.0, 3.0)).analyze_reviews(REVIEWS)
+        assert results['cascade_stage_counts'] == {'linear': len(REVIEWS), 'mlp': 0}
+        assert np.allclose(sorted(r['confidence'] for r in results['detailed_results']),
+                           np.sort(np.maximum(linear_positive, 1 - linear_positive)))
+
+        # Only reviews inside the band are re-scored
+        low, high = np.quantile(linear_positive, [0.25, 0.75])
+        uncertain = int(np.count_nonzero((linear_positive >= low) & (linear_positive <= high)))
+        results = SentimentAnalyzer(model_dir=tmp_dir, cascade_band=(low, high)).analyze_reviews(REVIEWS)
+        assert results['cascade_stage_counts'] == {'linear': len(REVIEWS) - uncertain, 'mlp': uncertain}
+        assert sum(r['stage'] == 'mlp' for r in results['detailed_results']) == uncertain
+
+        # Swapping the linear model changes the cascade fingerprint only
+        fingerprint, cascade_fingerprint = model_fingerprint(tmp_dir), model_fingerprint(tmp_dir, cascade=True)
+        joblib.dump(LogisticRegression(C=1.0).fit(X, TRAINING_LABELS), os.path.join(tmp_dir, 'cascade_model.pkl'))
+        assert model_fingerprint(tmp_dir) == fingerprint
+        assert model_fingerprint(tmp_dir, cascade=True) != cascade_fingerprint
+
+        registry.clear()
+
+    print("Cascade gating, stage counts and fingerprint behave as expected")
+
+
+if __name__ == "__main__":
+    test_cascade_gating_and_stage_counts()
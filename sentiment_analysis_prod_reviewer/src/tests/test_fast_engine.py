@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.neural_network import MLPClassifier
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.fast_engine import FastSentimentEngine, export_fast_engine
+
+
+def test_fast_engine_matches_sklearn():
+    print("Testing fast engine against the sklearn pipeline...")
+
+    texts = [
+        "This product is amazing! It works perfectly.",
+        "I'm disappointed with this product. It broke after one use.",
+        "The quality is terrible and it doesn't work as advertised.",
+        "Great value for money. Highly recommend this product!",
+        "Awful, awful, awful. Returned it the next day.",
+        "Love it, best purchase this year.",
+    ]
+    labels = ['Positive', 'Negative', 'Negative', 'Positive', 'Negative', 'Positive']
+
+    vectorizer = TfidfVectorizer(max_features=5000)
+    X = vectorizer.fit_transform(texts)
+    model = MLPClassifier(hidden_layer_sizes=(16,), max_iter=300, random_state=42)
+    model.fit(X, labels)
+
+    new_texts = texts + ["Works great, no complaints", "", "Unknown words only zzz qqq"]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'engine.npz')
+        export_fast_engine(model, vectorizer, path)
+        engine = FastSentimentEngine.load(path)
+
+        # The uncompressed array directory loads memory-mapped with the same weights
+        array_dir = os.path.join(tmp_dir, 'engine')
+        export_fast_engine(model, vectorizer, array_dir)
+        mapped_engine = FastSentimentEngine.load(array_dir, mmap_mode='r')
+        assert np.allclose(mapped_engine.predict_proba(new_texts), engine.predict_proba(new_texts))
+        del mapped_engine
+
+    expected_X = vectorizer.transform(new_texts)
+    assert np.allclose(engine.transform(new_texts).toarray(), expected_X.toarray())
+    assert np.allclose(engine.predict_proba(new_texts), model.predict_proba(expected_X))
+    assert list(engine.predict(new_texts)) == list(model.predict(expected_X))
+
+    # Reduced precision weights keep the predictions of the float64 model
+    for weight_dtype in ('float32', 'float16', 'int8'):
+        quantized = FastSentimentEngine.from_model(model, vectorizer, weight_dtype)
+        assert quantized.weight_nbytes < engine.weight_nbytes
+        assert np.allclose(quantized.predict_proba(new_texts), engine.predict_proba(new_texts), atol=0.05)
+
+    print("Fast engine predictions match sklearn")
+
+
+if __name__ == "__main__":
+    test_fast_engine_matches_sklearn()
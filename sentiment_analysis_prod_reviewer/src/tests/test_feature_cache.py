@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.feature_cache import feature_cache_key, load_features, save_features
+
+
+def test_feature_cache_round_trip():
+    print("Testing the feature cache...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = os.path.join(tmp_dir, 'reviews.csv')
+        with open(data_path, 'w') as f:
+            f.write("Text,Score\nGreat,5\nAwful,1\n")
+
+        vectorizer = TfidfVectorizer(max_features=100)
+        key = feature_cache_key(data_path, 2, 42, vectorizer, tmp_dir)
+        assert key == feature_cache_key(data_path, 2, 42, TfidfVectorizer(max_features=100), tmp_dir)
+        assert key != feature_cache_key(data_path, 2, 7, vectorizer, tmp_dir)
+        assert key != feature_cache_key(data_path, 2, 42, TfidfVectorizer(max_features=50), tmp_dir)
+        assert load_features(key, tmp_dir) is None
+
+        y_train = pd.Series(['Positive', 'Negative'], index=[10, 3], name='Sentiment')
+        y_test = pd.Series(['Negative'], index=[7], name='Sentiment')
+        X_train = vectorizer.fit_transform(['great stuff', 'awful stuff'])
+        X_test = vectorizer.transform(['awful'])
+        save_features(key, X_train, X_test, y_train, y_test, vectorizer, tmp_dir)
+
+        X_train_c, X_test_c, y_train_c, y_test_c, vectorizer_c = load_features(key, tmp_dir)
+        assert (X_train_c != X_train).nnz == 0 and (X_test_c != X_test).nnz == 0
+        assert list(y_train_c) == list(y_train) and list(y_train_c.index) == [10, 3]
+        assert vectorizer_c.vocabulary_ == vectorizer.vocabulary_
+
+    print("Feature cache round trip works")
+
+
+if __name__ == "__main__":
+    test_feature_cache_round_trip()
@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+
+import joblib
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import LabelEncoder
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.model_integration import PredictionCache, SentimentAnalyzer
+
+TRAINING_TEXTS = ['great product love it', 'excellent quality works great', 'good value love it',
+                  'terrible broken waste', 'awful quality broke quickly', 'bad product hate it']
+TRAINING_LABELS = ['Positive'] * 3 + ['Negative'] * 3
+
+
+def test_saved_hashing_pipeline_scores_through_analyzer():
+    print("Testing a saved hashing vectorizer pipeline...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Same front end as build_vectorizer('hashing') in ai_model.py (not imported: it needs TensorFlow)
+        vectorizer = make_pipeline(HashingVectorizer(n_features=2 ** 14, alternate_sign=False, norm=None),
+                                   TfidfTransformer())
+        model = LogisticRegression(C=10.0).fit(vectorizer.fit_transform(TRAINING_TEXTS), TRAINING_LABELS)
+        joblib.dump(model, os.path.join(tmp_dir, 'sentiment_model.pkl'))
+        joblib.dump(vectorizer, os.path.join(tmp_dir, 'vectorizer.pkl'))
+        joblib.dump(LabelEncoder().fit(['Negative', 'Positive']), os.path.join(tmp_dir, 'label_encoder.pkl'))
+
+        analyzer = SentimentAnalyzer(model_dir=tmp_dir, cache=PredictionCache())
+        reviews = [{'body': 'great product, love it'}, {'body': 'terrible, it broke quickly'}]
+        results = analyzer.analyze_reviews(reviews)
+        assert results['model_name'] != 'Fallback Model'
+        assert results['positive_count'] == 1 and results['negative_count'] == 1
+        by_review = {r['review']: r['sentiment'] for r in results['detailed_results']}
+        assert by_review == {'great product, love it': 'positive', 'terrible, it broke quickly': 'negative'}
+
+        # The cached second pass gives the same answer
+        assert analyzer.analyze_reviews(reviews) == results
+
+    print("Hashing pipelines score through SentimentAnalyzer")
+
+
+if __name__ == "__main__":
+    test_saved_hashing_pipeline_scores_through_analyzer()
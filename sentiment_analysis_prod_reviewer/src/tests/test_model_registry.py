@@ -0,0 +1,87 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.model_integration import SentimentAnalyzer
+from src.models.model_registry import ModelRegistry, registry
+
+TRAINING_TEXTS = ['great product love it', 'excellent quality works great', 'terrible broken waste',
+                  'awful quality broke quickly']
+TRAINING_LABELS = ['Positive', 'Positive', 'Negative', 'Negative']
+
+
+def save_tiny_model(model_dir):
+    """Save a small sklearn model in the layout save_model_for_integration() writes"""
+    vectorizer = TfidfVectorizer()
+    model = LogisticRegression().fit(vectorizer.fit_transform(TRAINING_TEXTS), TRAINING_LABELS)
+    joblib.dump(model, os.path.join(model_dir, 'sentiment_model.pkl'))
+    joblib.dump(vectorizer, os.path.join(model_dir, 'vectorizer.pkl'))
+    joblib.dump(LabelEncoder().fit(['Negative', 'Positive']), os.path.join(model_dir, 'label_encoder.pkl'))
+
+
+def test_registry_shares_artifacts_and_retries_failed_loads():
+    print("Testing the model registry...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        reviews = [{'body': 'great product'}, {'body': 'terrible and broken'}]
+
+        # Nothing is loaded until an analyzer needs the model
+        first = SentimentAnalyzer(model_dir=tmp_dir)
+        second = SentimentAnalyzer(model_dir=tmp_dir)
+        assert not registry.is_loaded(tmp_dir)
+
+        # Without model files the analyzer falls back, and the failure is not cached
+        assert first.analyze_reviews(reviews)['model_name'] == 'Fallback Model'
+        assert not registry.is_loaded(tmp_dir)
+
+        # Once the model is in place the next call loads it, and both analyzers share it
+        save_tiny_model(tmp_dir)
+        assert first.analyze_reviews(reviews)['model_name'] != 'Fallback Model'
+        assert registry.is_loaded(tmp_dir)
+        assert second.model is first.model and second.vectorizer is first.vectorizer
+
+        registry.clear()
+
+    print("Registry loads lazily, shares artifacts and retries failed loads")
+
+
+def test_registry_loads_once_under_concurrency():
+    print("Testing concurrent registry access...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        save_tiny_model(tmp_dir)
+        shared = ModelRegistry()
+        load = shared._load
+        calls = []
+
+        def slow_load(*args):
+            calls.append(args)
+            time.sleep(0.05)
+            return load(*args)
+
+        shared._load = slow_load
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(shared.get(tmp_dir))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert len(results) == 8 and all(artifacts is results[0] for artifacts in results)
+
+    print("Concurrent get() calls load the artifacts once")
+
+
+if __name__ == "__main__":
+    test_registry_shares_artifacts_and_retries_failed_loads()
+    test_registry_loads_once_under_concurrency()
@@ -0,0 +1,45 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.model_integration import PredictionCache
+
+
+def test_prediction_cache():
+    print("Testing prediction cache...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'predictions.sqlite')
+        cache = PredictionCache(max_entries=2, db_path=db_path)
+
+        # Normalized texts share a key, different model fingerprints do not
+        key = cache.make_key("Great  product", "model-a")
+        assert key == cache.make_key("great product", "model-a")
+        assert key != cache.make_key("great product", "model-b")
+
+        cache.put_many([(key, [0.1, 0.9])])
+        found = cache.get_many([key, cache.make_key("unseen", "model-a")])
+        assert np.allclose(found[key], [0.1, 0.9])
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+        # Entries evicted from the LRU tier are still served from SQLite
+        cache.put_many([(cache.make_key(f"review {i}", "model-a"), [0.5, 0.5]) for i in range(3)])
+        assert cache.stats()['memory_entries'] == 2
+        assert key in cache.get_many([key])
+
+        # A fresh cache on the same file sees the persisted predictions
+        reopened = PredictionCache(db_path=db_path)
+        assert np.allclose(reopened.get_many([key])[key], [0.1, 0.9])
+        reopened.close()
+        cache.close()
+
+    print("Prediction cache works as expected")
+
+
+if __name__ == "__main__":
+    test_prediction_cache()
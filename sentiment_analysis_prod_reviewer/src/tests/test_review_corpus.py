@@ -0,0 +1,36 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.review_corpus import iter_review_chunks, reservoir_sample
+
+
+def test_reservoir_sample_is_chunk_size_independent():
+    print("Testing the streaming review sampler...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'Reviews.csv')
+        with open(path, 'w') as f:
+            f.write("Id,ProductId,Score,Summary,Text\n")
+            for i in range(1000):
+                f.write(f'{i},B00{i},{i % 5 + 1},"summary {i}","review text number {i}"\n')
+
+        sample, total_rows, score_counts = reservoir_sample(iter_review_chunks(path, chunksize=64), 100, 7)
+        assert total_rows == 1000
+        assert len(sample) == 100 and sample.index.is_unique
+        assert list(sample.columns) == ['Text', 'Score'] and str(sample['Score'].dtype) == 'int8'
+        assert score_counts.sum() == 1000 and score_counts[3] == 200
+
+        # Row keys follow the stream, so the chunk size does not change the sample
+        same_sample, _, _ = reservoir_sample(iter_review_chunks(path, chunksize=333), 100, 7)
+        assert list(same_sample.index) == list(sample.index)
+        first = sample.index[0]
+        assert sample.loc[first, 'Text'] == f"review text number {first}"
+
+    print("Reservoir sample is uniform over the stream and chunk size independent")
+
+
+if __name__ == "__main__":
+    test_reservoir_sample_is_chunk_size_independent()
@@ -0,0 +1,45 @@
+import glob
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.model_integration import SentimentAnalyzer, iter_reviews_from_csv
+
+
+def test_stream_skips_bodyless_files_and_matches_batch_analysis():
+    print("Testing streamed analysis of review CSV files...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bodies = ['Great product, I love it', 'Terrible and broken', 'Excellent value', 'Awful, the worst',
+                  'Good enough', 'Great quality, amazing']
+        with open(os.path.join(tmp_dir, 'B000TEST_reviews.csv'), 'w') as f:
+            f.write("product_title,rating,title,body\n")
+            for i, body in enumerate(bodies * 5):
+                f.write(f'Test Product,{i % 5 + 1},Title {i},"{body}"\n')
+        # Product search exports in output/data have no review bodies
+        with open(os.path.join(tmp_dir, 'B000TEST_alternatives.csv'), 'w') as f:
+            f.write("title,price,link\nOther Product,9.99,https://example.com\n")
+
+        paths = sorted(glob.glob(os.path.join(tmp_dir, '*.csv')))
+        reviews = list(iter_reviews_from_csv(paths, chunksize=7))
+        assert len(reviews) == len(bodies) * 5
+
+        # Small model chunks so the summary is folded across several chunks
+        analyzer = SentimentAnalyzer(model_dir=tmp_dir)
+        summary = None
+        for update in analyzer.analyze_reviews_stream(iter_reviews_from_csv(paths, chunksize=7), chunk_size=4):
+            summary = update['summary']
+        expected = analyzer.analyze_reviews(reviews, include_details=False)
+
+        for key in ('overall_sentiment', 'positive_count', 'negative_count', 'model_name'):
+            assert summary[key] == expected[key], key
+        for key in ('score', 'average_confidence'):
+            assert abs(summary[key] - expected[key]) < 1e-9, key
+
+    print("Streamed summary matches analyze_reviews and bodyless files are skipped")
+
+
+if __name__ == "__main__":
+    test_stream_skips_bodyless_files_and_matches_batch_analysis()
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.api.scoring_service import ScoringService, ScoringServiceClient
+from src.models.model_integration import AnalysisResult, SentimentAnalyzer
+
+
+def http_request(payload):
+    """StreamReader holding one POST /analyze request"""
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+    reader = asyncio.StreamReader()
+    reader.feed_data(f"POST /analyze HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+    reader.feed_eof()
+    return reader
+
+
+def test_malformed_request_does_not_fail_its_batch():
+    print("Testing micro-batches with a malformed request...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        analyzer = SentimentAnalyzer(model_dir=tmp_dir)
+        good = [{'body': 'Great product, I love it'}, {'body': 'Terrible and broken'}]
+
+        async def run():
+            # A long wait makes all requests land in the same batch
+            service = ScoringService(analyzer, max_wait_ms=200)
+            service.batcher.start()
+            try:
+                responses = await asyncio.gather(
+                    service._handle_request(http_request({'reviews': good})),
+                    service._handle_request(http_request({'reviews': ['just a string']})),
+                    service._handle_request(http_request({'reviews': good[:1]})),
+                )
+
+                # Lists that bypass the HTTP validation still fail on their own
+                batched = await asyncio.gather(
+                    service.batcher.submit(good),
+                    service.batcher.submit(['just a string']),
+                    return_exceptions=True
+                )
+            finally:
+                await service.batcher.stop()
+            return responses, batched
+
+        responses, batched = asyncio.run(run())
+        (status_good, result_good), (status_bad, error), (status_single, result_single) = responses
+        assert status_bad == 400 and 'body' in error['error']
+        assert status_good == 200 and result_good == analyzer.analyze_reviews(good)
+        assert status_single == 200 and result_single['positive_count'] == 1
+        assert batched[0] == analyzer.analyze_reviews(good)
+        assert isinstance(batched[1], Exception)
+
+    print("A malformed request gets a 400 and the rest of its batch succeeds")
+
+
+def test_client_round_trips_top_k_and_columnar():
+    print("Testing the scoring service client...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        analyzer = SentimentAnalyzer(model_dir=tmp_dir)
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        service = ScoringService(analyzer)
+        threading.Thread(target=asyncio.run, args=(service.serve('127.0.0.1', port),), daemon=True).start()
+
+        client = ScoringServiceClient(f'http://127.0.0.1:{port}', model_dir=tmp_dir)
+        deadline = time.time() + 10
+        while not client.service_reachable():
+            assert time.time() < deadline, "scoring service did not start"
+            time.sleep(0.05)
+
+        reviews = [{'body': 'Great product, I love it', 'rating': 5}, {'body': 'Terrible and broken', 'rating': 1},
+                   {'body': 'Excellent, the best', 'rating': 4}]
+        remote = client.analyze_reviews(reviews, top_k=1)
+        assert remote['top_reviews'] == analyzer.analyze_reviews(reviews, top_k=1)['top_reviews']
+
+        columnar = client.analyze_reviews(reviews, columnar=True)['detailed_results']
+        assert isinstance(columnar, AnalysisResult)
+        assert columnar.to_records() == analyzer.analyze_reviews(reviews)['detailed_results']
+
+    print("The client passes top_k and columnar through the service")
+
+
+if __name__ == "__main__":
+    test_malformed_request_does_not_fail_its_batch()
+    test_client_round_trips_top_k_and_columnar()
@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models.text_preprocessing import deduplicate_texts, normalize_review_text
+
+
+def test_boilerplate_and_duplicates():
+    print("Testing review normalization and deduplication...")
+
+    assert normalize_review_text("Click to play video\nWorks   great<br />really") == "Works great really"
+    assert normalize_review_text(None) == ""
+
+    long_review = ("The dehumidifier is heavy and well built, the buttons are simple and it dropped "
+                   "the humidity in our bathroom from fifty to thirty eight percent in about an hour")
+    texts = [
+        "Click to play video " + long_review,
+        "Great product",
+        "great   PRODUCT",
+        long_review.replace(" and it", ", and it") + "!!",
+        "Terrible, broke after a week",
+    ]
+    unique_texts, inverse = deduplicate_texts(texts)
+
+    assert inverse[0] == inverse[3], "near-duplicates share a representative"
+    assert inverse[1] == inverse[2], "exact duplicates ignore case and whitespace"
+    assert len(unique_texts) == 3
+    assert unique_texts[inverse[0]] == long_review
+
+    print("Boilerplate stripped and duplicates grouped")
+
+
+if __name__ == "__main__":
+    test_boilerplate_and_duplicates()
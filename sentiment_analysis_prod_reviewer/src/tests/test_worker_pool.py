@@ -0,0 +1,56 @@
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.models import worker_pool
+from src.models.worker_pool import create_pool, worker_n_jobs
+
+# Set by the pool initializer in each worker, or by prepare_parent before forking
+_shared_value = None
+
+
+def _set_shared_value(value):
+    global _shared_value
+    _shared_value = value
+
+
+def _report(_):
+    return _shared_value, worker_n_jobs(), os.environ.get('OMP_NUM_THREADS')
+
+
+def test_pool_workers_are_initialized_and_thread_limited():
+    print("Testing the shared worker pool...")
+
+    with create_pool(2, initializer=_set_shared_value, initargs=('loaded',), threads_per_worker=1) as pool:
+        reports = pool.map(_report, range(4))
+    assert reports == [('loaded', 1, '1')] * 4
+
+    # Defaults to an even share of the cores
+    with create_pool(2) as pool:
+        _, n_jobs, omp_threads = pool.apply(_report, (None,))
+    assert n_jobs == max(1, (os.cpu_count() or 1) // 2)
+    assert omp_threads == str(n_jobs)
+
+    # The parent is never limited, so its estimators keep using every core
+    assert worker_pool._worker_threads is None
+    assert worker_n_jobs() == -1
+    print("Pool workers are initialized and thread limited")
+
+
+def test_prepare_parent_runs_before_fork():
+    print("Testing state shared with forked workers...")
+
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        print("Skipped: fork is not available")
+        return
+    with create_pool(1, prepare_parent=lambda: _set_shared_value('inherited')) as pool:
+        assert pool.apply(_report, (None,))[0] == 'inherited'
+    _set_shared_value(None)
+    print("Forked workers inherit what prepare_parent loads")
+
+
+if __name__ == "__main__":
+    test_pool_workers_are_initialized_and_thread_limited()
+    test_prepare_parent_runs_before_fork()
@@ -19,16 +19,46 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 from src.scraper.amazon_review_scraper import AmazonReviewScraper
 from src.scraper.amazon_price_extractor import extract_price
 from src.models.model_integration import SentimentAnalyzer
+from src.models.aggregate_store import ProductSentimentStore
 from src.api.serp_api_integration import get_exact_and_alternative_products
+from src.api.scoring_service import ScoringServiceClient
 
-# Initialize the sentiment analyzer
-analyzer = SentimentAnalyzer()
+# Initialize the sentiment analyzer, scoring through the shared service when one is configured
+SENTIMENT_SERVICE_URL = os.environ.get('SENTIMENT_SERVICE_URL')
 
-def predict_sentiment_from_reviews(reviews):
+@st.cache_resource
+def load_analyzer():
+    """Create the analyzer once per server process and warm it up in the background"""
+    analyzer = ScoringServiceClient(SENTIMENT_SERVICE_URL) if SENTIMENT_SERVICE_URL else SentimentAnalyzer()
+    analyzer.warmup(background=True)
+    return analyzer
+
+analyzer = load_analyzer()
+
+@st.cache_resource
+def load_aggregate_store():
+    """Open the per-product sentiment aggregate store once per server process"""
+    return ProductSentimentStore()
+
+def extract_asin(link):
+    """Return the ASIN of an Amazon product link, or None"""
+    match = re.search(r'/(?:dp|gp/product|product-reviews)/([A-Z0-9]{10})', link or '')
+    return match.group(1) if match else None
+
+def predict_sentiment_from_reviews(reviews, asin=None):
     """
     Analyze reviews using the trained model
+
+    With an ASIN, only reviews not seen before for that product are scored and
+    the result is the product's stored aggregate over all its reviews so far.
     """
-    results = analyzer.analyze_reviews(reviews)
+    if not analyzer.is_ready:
+        with st.spinner("Loading the sentiment model..."):
+            analyzer.wait_until_ready()
+    if asin:
+        results = load_aggregate_store().update(asin, reviews, analyzer)
+    else:
+        results = analyzer.analyze_reviews(reviews)
     sentiment = results['overall_sentiment']
     score = results['score']
     pos_count = results['positive_count']
@@ -114,7 +144,8 @@ def show_results_page():
             reviews = []
     
     if reviews:
-        sentiment, score, pos_count, neg_count, detailed_results, model_name = predict_sentiment_from_reviews(reviews)
+        sentiment, score, pos_count, neg_count, detailed_results, model_name = predict_sentiment_from_reviews(
+            reviews, extract_asin(link))
         product_title = reviews[0].get('product_title', 'Amazon Product')
     else:
         st.warning("No reviews found or failed to scrape reviews.")